@@ -134,7 +134,7 @@ class AliIot:
             data = ujson.loads(data)
         except Exception:
             pass
-        log.debug("topic: %s, data: %s" % (topic, str(data)))
+        log.debug("topic: %s, data: %s", topic, data)
 
         if topic.endswith("/post_reply"):
             self.__put_post_res(data["id"], True if int(data["code"]) == 200 else False)
@@ -147,7 +147,7 @@ class AliIot:
 
     def __subscribe_topic(self, topic):
         subscribe_res = self.__server.subscribe(topic, qos=self.__qos) if self.__server else -1
-        log.debug("subscribe_topic %s %s" % (topic, "success" if subscribe_res == 0 else "falied"))
+        log.debug("subscribe_topic %s %s", topic, "success" if subscribe_res == 0 else "falied")
         return True if subscribe_res == 0 else False
 
     def __subscribe_topics(self):
@@ -186,7 +186,7 @@ class AliIot:
     def status(self):
         try:
             _status = self.__server.getAliyunSta() if self.__server else -1
-            log.debug("getAliyunSta: %s" % _status)
+            log.debug("getAliyunSta: %s", _status)
             return True if _status == 0 else False
         except Exception as e:
             sys.print_exception(e)
@@ -219,14 +219,14 @@ class AliIot:
 
     def connect(self):
         res = -1
-        log.debug("self.__product_key: %s" % self.__product_key)
-        log.debug("self.__product_secret: %s" % self.__product_secret)
-        log.debug("self.__device_name: %s" % self.__device_name)
-        log.debug("self.__device_secret: %s" % self.__device_secret)
-        log.debug("self.__server: %s" % self.__server)
+        log.debug("self.__product_key: %s", self.__product_key)
+        log.debug("self.__product_secret: %s", self.__product_secret)
+        log.debug("self.__device_name: %s", self.__device_name)
+        log.debug("self.__device_secret: %s", self.__device_secret)
+        log.debug("self.__server: %s", self.__server)
         self.__server = aLiYun(self.__product_key, self.__product_secret, self.__device_name, self.__device_secret, self.__server)
         res = self.__server.setMqtt(self.__device_name)
-        log.debug("connect res: %s" % res)
+        log.debug("connect res: %s", res)
         if res == 0:
             self.__server.setCallback(self.__subscribe_callback)
             res = self.__subscribe_topics()
@@ -241,7 +241,7 @@ class AliIot:
                 self.__server.disconnect()
         except Exception as e:
             sys.print_exception(e)
-            log.error("Ali disconnect falied. %s" % e)
+            log.error("Ali disconnect falied. %s", e)
         finally:
             self.__server = None
         return True
@@ -334,7 +334,7 @@ class AliIot:
             "method": "thing.ota.firmware.get"
         }
         publish_res = self.__server.publish(self.ota_topic_firmware_get, ujson.dumps(publish_data), qos=self.__qos) if self.__server else False
-        log.debug("module: %s, publish_res: %s" % (module, publish_res))
+        log.debug("module: %s, publish_res: %s", module, publish_res)
         return self.__get_post_res(_id) if publish_res else False
 
     def ota_device_progress(self, step, desc, module):
@@ -425,7 +425,7 @@ class AliIotOTA:
         down_status = args[0]
         down_process = args[1]
         if down_status in (0, 1):
-            log.debug("DownStatus: %s [%s][%s%%]" % (down_status, "=" * down_process, down_process))
+            log.debug("DownStatus: %s [%s][%s%%]", down_status, "=" * down_process, down_process)
             if down_process < 100:
                 self.__server.ota_device_progress(down_process, "Downloading File.", module=self.__module)
             else:
@@ -435,7 +435,7 @@ class AliIotOTA:
             self.__server.ota_device_progress(100, "Download File Over.", module=self.__module)
             self.__fota_queue.put(True)
         else:
-            log.error("Down Failed. Error Code [%s] %s" % (down_process, FOTA_ERROR_CODE.get(down_process, down_process)))
+            log.error("Down Failed. Error Code [%s] %s", down_process, FOTA_ERROR_CODE.get(down_process, down_process))
             self.__server.ota_device_progress(-2, FOTA_ERROR_CODE.get(down_process, down_process), module=self.__module)
             self.__fota_queue.put(False)
 
@@ -447,13 +447,13 @@ class AliIotOTA:
         log.debug("__start_sota")
         app_fota_obj = app_fota.new()
         download_infos = [{"url": i["url"], "file_name": i["name"]} for i in self.__files]
-        log.debug("download_infos: %s" % str(download_infos))
+        log.debug("download_infos: %s", download_infos)
         bulk_download_res = app_fota_obj.bulk_download(download_infos)
-        log.debug("first bulk_download_res: %s" % str(bulk_download_res))
+        log.debug("first bulk_download_res: %s", bulk_download_res)
         count = 0
         while bulk_download_res:
             bulk_download_res = app_fota_obj.bulk_download(bulk_download_res)
-            log.debug("[%s]retry bulk_download_res: %s" % (count, str(bulk_download_res)))
+            log.debug("[%s]retry bulk_download_res: %s", count, bulk_download_res)
             if bulk_download_res:
                 count += 1
             if count > 3 and bulk_download_res:
@@ -0,0 +1,269 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :geofence.py
+@brief     :Circle and polygon geofences with a grid index.
+@version   :1.0.0
+@date      :2026-10-18 10:00:00
+@copyright :Copyright (c) 2022
+"""
+
+import sys
+import math
+import _thread
+from array import array
+
+__all__ = ["GeoFence"]
+
+_M_PER_DEG = 6371008.8 * math.pi / 180.0
+
+
+class GeoFence:
+    """This class is geofence management.
+
+    Fences are circles and polygons in WGS-84 degrees. Each fence is added to the cells of a uniform grid
+    covered by its bounding box, so a fix only tests the fences of its own cell, first by bounding box and
+    then exactly. Fences covering too many cells are kept in a list checked by bounding box on every fix.
+
+    Usage:
+        from usr.modules.geofence import GeoFence
+
+        fence = GeoFence(cell_size=0.01, dwell=60)
+        fence.add_circle("depot", 31.8222, 117.1154, 200)
+        fence.add_polygon("site", [(31.82, 117.11), (31.83, 117.11), (31.83, 117.12), (31.82, 117.12)])
+        fence.set_callback(lambda event, fid, fix: print(event, fid))
+        gnss.subscribe(fence.on_fix)
+    """
+
+    ENTER = 1
+    EXIT = 2
+    DWELL = 3
+
+    CIRCLE = 0
+    POLYGON = 1
+
+    # A fence covering more grid cells than this is not indexed.
+    _MAX_CELLS = 256
+
+    def __init__(self, cell_size=0.01, dwell=0):
+        """
+        Args:
+            cell_size (float): grid cell size (degree), about the size of the usual fence. (default: 0.01)
+            dwell (int): default time inside a fence before DWELL event (s), 0 - disable. (default: 0)
+        """
+        assert cell_size > 0, "cell_size must be larger than 0."
+        self.__cell_size = cell_size
+        self.__dwell = dwell
+        self.__lock = _thread.allocate_lock()
+        # fid: (kind, min_lat, min_lng, max_lat, max_lng, shape, dwell)
+        self.__fences = {}
+        self.__grid = {}
+        self.__large = []
+        # fid: [enter time, dwell reported]
+        self.__inside = {}
+        self.__callback = None
+
+    def __cells(self, min_lat, min_lng, max_lat, max_lng):
+        size = self.__cell_size
+        x0, x1 = int(math.floor(min_lng / size)), int(math.floor(max_lng / size))
+        y0, y1 = int(math.floor(min_lat / size)), int(math.floor(max_lat / size))
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self._MAX_CELLS:
+            return None
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def __add(self, fid, fence):
+        with self.__lock:
+            self.__remove(fid)
+            self.__fences[fid] = fence
+            cells = self.__cells(fence[1], fence[2], fence[3], fence[4])
+            if cells is None:
+                self.__large.append(fid)
+                return
+            for cell in cells:
+                fids = self.__grid.get(cell)
+                if fids is None:
+                    self.__grid[cell] = [fid]
+                else:
+                    fids.append(fid)
+
+    def __remove(self, fid):
+        fence = self.__fences.pop(fid, None)
+        if fence is None:
+            return False
+        self.__inside.pop(fid, None)
+        cells = self.__cells(fence[1], fence[2], fence[3], fence[4])
+        if cells is None:
+            self.__large.remove(fid)
+            return True
+        for cell in cells:
+            fids = self.__grid[cell]
+            fids.remove(fid)
+            if not fids:
+                self.__grid.pop(cell)
+        return True
+
+    def add_circle(self, fid, lat, lng, radius, dwell=None):
+        """Add or replace a circle fence.
+
+        Args:
+            fid (str/int): fence id.
+            lat (float): center latitude (degree).
+            lng (float): center longitude (degree).
+            radius (float): radius (m).
+            dwell (int): time inside before DWELL event (s), None - use the default. (default: None)
+        """
+        assert radius > 0, "radius must be larger than 0."
+        cos_lat = math.cos(math.radians(lat))
+        d_lat = radius / _M_PER_DEG
+        d_lng = radius / (_M_PER_DEG * max(cos_lat, 1e-6))
+        self.__add(fid, (
+            self.CIRCLE, lat - d_lat, lng - d_lng, lat + d_lat, lng + d_lng,
+            (lat, lng, radius * radius, cos_lat), self.__dwell if dwell is None else dwell
+        ))
+
+    def add_polygon(self, fid, points, dwell=None):
+        """Add or replace a polygon fence.
+
+        Args:
+            fid (str/int): fence id.
+            points (list): vertexes [(lat, lng), ...], at least 3, not closed.
+            dwell (int): time inside before DWELL event (s), None - use the default. (default: None)
+        """
+        assert len(points) >= 3, "polygon must have at least 3 points."
+        lats = array("d", [p[0] for p in points])
+        lngs = array("d", [p[1] for p in points])
+        self.__add(fid, (
+            self.POLYGON, min(lats), min(lngs), max(lats), max(lngs),
+            (lats, lngs), self.__dwell if dwell is None else dwell
+        ))
+
+    def remove(self, fid):
+        """Remove a fence.
+
+        Args:
+            fid (str/int): fence id.
+
+        Returns:
+            bool: True - success, False - fence not exists.
+        """
+        with self.__lock:
+            return self.__remove(fid)
+
+    def clear(self):
+        """Remove all fences."""
+        with self.__lock:
+            self.__fences = {}
+            self.__grid = {}
+            self.__large = []
+            self.__inside = {}
+
+    def __len__(self):
+        return len(self.__fences)
+
+    def set_callback(self, callback):
+        """Set fence event callback.
+
+        Args:
+            callback (function): callback(event, fid, fix), event is ENTER / EXIT / DWELL.
+        """
+        assert callback is None or callable(callback), "callback must be callable."
+        self.__callback = callback
+
+    def __contains(self, fence, lat, lng):
+        if lat < fence[1] or lat > fence[3] or lng < fence[2] or lng > fence[4]:
+            return False
+        shape = fence[5]
+        if fence[0] == self.CIRCLE:
+            dy = lat - shape[0]
+            dx = (lng - shape[1]) * shape[3]
+            return (dx * dx + dy * dy) * (_M_PER_DEG * _M_PER_DEG) <= shape[2]
+        lats, lngs = shape
+        inside = False
+        j = len(lats) - 1
+        for i in range(len(lats)):
+            yi, yj = lats[i], lats[j]
+            if (yi > lat) != (yj > lat) and lng < (lngs[j] - lngs[i]) * (lat - yi) / (yj - yi) + lngs[i]:
+                inside = not inside
+            j = i
+        return inside
+
+    def __candidates(self, lat, lng):
+        size = self.__cell_size
+        fids = self.__grid.get((int(math.floor(lng / size)), int(math.floor(lat / size))))
+        if not self.__large:
+            return fids or ()
+        return (fids or []) + self.__large
+
+    def check(self, lat, lng):
+        """Get the fences containing a point.
+
+        Args:
+            lat (float): latitude (degree).
+            lng (float): longitude (degree).
+
+        Returns:
+            list: fence ids.
+        """
+        with self.__lock:
+            fences = self.__fences
+            return [fid for fid in self.__candidates(lat, lng) if self.__contains(fences[fid], lat, lng)]
+
+    def inside(self):
+        """Get the fences the last fix is in.
+
+        Returns:
+            list: fence ids.
+        """
+        with self.__lock:
+            return list(self.__inside.keys())
+
+    def on_fix(self, fix):
+        """Update fence states by a new fix, can be used as `GNSSBase.subscribe` callback.
+
+        Args:
+            fix (GNSSFix): gnss fix, any object with `time`, `lat` and `lng` attributes.
+
+        Returns:
+            list: events [(event, fid), ...].
+        """
+        events = []
+        with self.__lock:
+            fences = self.__fences
+            inside = self.__inside
+            current = set()
+            for fid in self.__candidates(fix.lat, fix.lng):
+                if self.__contains(fences[fid], fix.lat, fix.lng):
+                    current.add(fid)
+                    if fid not in inside:
+                        inside[fid] = [fix.time, False]
+                        events.append((self.ENTER, fid))
+            for fid in list(inside.keys()):
+                if fid not in current:
+                    inside.pop(fid)
+                    events.append((self.EXIT, fid))
+                    continue
+                state = inside[fid]
+                dwell = fences[fid][6]
+                if dwell and not state[1] and fix.time - state[0] >= dwell:
+                    state[1] = True
+                    events.append((self.DWELL, fid))
+        callback = self.__callback
+        if callback is not None:
+            for event, fid in events:
+                try:
+                    callback(event, fid, fix)
+                except Exception as e:
+                    sys.print_exception(e)
+        return events
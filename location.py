@@ -22,12 +22,17 @@
 """
 
 import sys
-import ure
 import math
+import ql_fs
 import utime
 import _thread
+from array import array
 from machine import UART, Pin, I2C
 
+try:
+    from ucollections import namedtuple
+except ImportError:
+    from collections import namedtuple
 try:
     import quecgnss
 except ImportError:
@@ -40,6 +45,14 @@ try:
     from wifilocator import wifilocator
 except ImportError:
     wifilocator = None
+try:
+    import net
+except ImportError:
+    net = None
+try:
+    import wifiScan
+except ImportError:
+    wifiScan = None
 try:
     from modules.logging import getLogger
 except ImportError:
@@ -51,11 +64,47 @@ _gps_data_set_lock = _thread.allocate_lock()
 
 CRLF = "\r\n"
 
+# One GNSS fix.
+#   time: UTC time of the fix, `utime.mktime` seconds.
+#   lat / lng: degree, negative for south / west.
+#   speed: km/h. course: degree. altitude: m. hdop: horizontal dilution of precision.
+#   satellites: satellites in view.
+GNSSFix = namedtuple("GNSSFix", ("time", "lat", "lng", "speed", "course", "altitude", "hdop", "satellites"))
+
+
+def nmea_sentence(body):
+    """Build an nmea sentence with checksum.
+
+    Args:
+        body (str): sentence between `$` and `*`, e.g. `PMTK220,1000`.
+
+    Returns:
+        str: `$<body>*<checksum>\r\n`.
+    """
+    checksum = 0
+    for char in body:
+        checksum ^= ord(char)
+    return "$%s*%02X%s" % (body, checksum, CRLF)
+
+
+def _float(value, default=0.0):
+    """Convert nmea field to float, return default if the field is empty or invalid."""
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
+
 
 class CoordinateSystemConvert:
 
     EE = 0.00669342162296594323
     EARTH_RADIUS = 6378.137  # Approximate Earth Radius(km)
+    MEAN_EARTH_RADIUS = 6371.0088  # Mean Earth Radius(km), used by distance.
+
+    _A = EARTH_RADIUS * 1000
+    _AEE = EARTH_RADIUS * 1000 * (1 - EE)
+    _RAD = math.pi / 180.0
+    _DEG = 180.0 / math.pi
 
     def _transformLat(self, x, y):
         ret = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.1 * x * y + 0.2 * math.sqrt(math.fabs(x))
@@ -71,91 +120,530 @@ class CoordinateSystemConvert:
         ret += (150.0 * math.sin(x / 12.0 * math.pi) + 300.0 * math.sin(x / 30.0 * math.pi)) * 2.0 / 3.0
         return ret
 
+    def _offset(self, lon, lat):
+        """Get GCJ02 offset of a WGS84 point.
+
+        Same result as `_transformLon` / `_transformLat`, but the terms shared by longitude and latitude are
+        computed once, sin(2x) and sin(6x) are derived from sin(x) / cos(x) and cos(lat) from sin(lat),
+        which needs 10 trig calls instead of 18.
+
+        Returns:
+            tuple: (longitude offset, latitude offset)
+        """
+        pi = math.pi
+        sin = math.sin
+        x = lon - 105.0
+        y = lat - 35.0
+        sqrt_x = math.sqrt(math.fabs(x))
+        sin_x = sin(x * pi)
+        sin_2x = 2.0 * sin_x * math.cos(x * pi)
+        sin_6x = sin_2x * (3.0 - 4.0 * sin_2x * sin_2x)
+        common = (20.0 * sin_6x + 20.0 * sin_2x) * 2.0 / 3.0 + 0.1 * x * y
+
+        d_lat = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.2 * sqrt_x + common
+        d_lat += (20.0 * sin(y * pi) + 40.0 * sin(y / 3.0 * pi)) * 2.0 / 3.0
+        d_lat += (160.0 * sin(y / 12.0 * pi) + 320 * sin(y * pi / 30.0)) * 2.0 / 3.0
+        d_lon = 300.0 + x + 2.0 * y + 0.1 * x * x + 0.1 * sqrt_x + common
+        d_lon += (20.0 * sin_x + 40.0 * sin(x / 3.0 * pi)) * 2.0 / 3.0
+        d_lon += (150.0 * sin(x / 12.0 * pi) + 300.0 * sin(x / 30.0 * pi)) * 2.0 / 3.0
+
+        sin_lat = sin(lat * self._RAD)
+        magic = 1 - sin_lat * sin_lat * self.EE
+        sqrt_magic = math.sqrt(magic)
+        d_lat = (d_lat * 180.0) / (self._AEE / (magic * sqrt_magic) * pi)
+        d_lon = (d_lon * 180.0) / (self._A / sqrt_magic * math.sqrt(1 - sin_lat * sin_lat) * pi)
+        return d_lon, d_lat
+
     def wgs84_to_gcj02(self, lon, lat):
-        dLat = self._transformLat(lon - 105.0, lat - 35.0)
-        dLon = self._transformLon(lon - 105.0, lat - 35.0)
-        radLat = lat / 180.0 * math.pi
-        magic = math.sin(radLat)
-        magic = 1 - magic * magic * self.EE
-        sqrtMagic = math.sqrt(magic)
+        d_lon, d_lat = self._offset(lon, lat)
+        return lon + d_lon, lat + d_lat
 
-        dLat = (dLat * 180.0) / ((self.EARTH_RADIUS * 1000 * (1 - self.EE)) / (magic * sqrtMagic) * math.pi)
-        dLon = (dLon * 180.0) / (self.EARTH_RADIUS * 1000 / sqrtMagic * math.cos(radLat) * math.pi)
-        lon02 = lon + dLon
-        lat02 = lat + dLat
+    def gcj02_to_wgs84(self, lon, lat, tolerance=1e-7, max_iter=10):
+        """Convert GCJ02 coordinate to WGS84 coordinate by iteration.
 
-        return lon02, lat02
+        Args:
+            lon (float): GCJ02 longitude.
+            lat (float): GCJ02 latitude.
+            tolerance (float): max error of the result converted back to GCJ02, unit: degree. (default: 1e-7, about 1cm)
+            max_iter (int): max iteration times. (default: 10)
+
+        Returns:
+            tuple: (WGS84 longitude, WGS84 latitude)
+        """
+        w_lon, w_lat = lon, lat
+        for _ in range(max_iter):
+            d_lon, d_lat = self._offset(w_lon, w_lat)
+            e_lon = w_lon + d_lon - lon
+            e_lat = w_lat + d_lat - lat
+            w_lon -= e_lon
+            w_lat -= e_lat
+            if math.fabs(e_lon) < tolerance and math.fabs(e_lat) < tolerance:
+                break
+        return w_lon, w_lat
+
+    def wgs84_to_gcj02_batch(self, lons, lats, out_lons=None, out_lats=None):
+        """Convert WGS84 coordinates to GCJ02 coordinates in one call.
+
+        Args:
+            lons (list/tuple/array): WGS84 longitudes.
+            lats (list/tuple/array): WGS84 latitudes.
+            out_lons (array): output longitudes, may be `lons` for converting in place. (default: new array("d"))
+            out_lats (array): output latitudes, may be `lats` for converting in place. (default: new array("d"))
+
+        Returns:
+            tuple: (GCJ02 longitudes, GCJ02 latitudes)
+        """
+        out_lons = array("d", lons) if out_lons is None else out_lons
+        out_lats = array("d", lats) if out_lats is None else out_lats
+        offset = self._offset
+        for i in range(len(lons)):
+            lon = lons[i]
+            lat = lats[i]
+            d_lon, d_lat = offset(lon, lat)
+            out_lons[i] = lon + d_lon
+            out_lats[i] = lat + d_lat
+        return out_lons, out_lats
+
+    def gcj02_to_wgs84_batch(self, lons, lats, out_lons=None, out_lats=None, tolerance=1e-7, max_iter=10):
+        """Convert GCJ02 coordinates to WGS84 coordinates in one call.
+
+        Args:
+            lons (list/tuple/array): GCJ02 longitudes.
+            lats (list/tuple/array): GCJ02 latitudes.
+            out_lons (array): output longitudes, may be `lons` for converting in place. (default: new array("d"))
+            out_lats (array): output latitudes, may be `lats` for converting in place. (default: new array("d"))
+            tolerance (float): see `gcj02_to_wgs84`.
+            max_iter (int): see `gcj02_to_wgs84`.
+
+        Returns:
+            tuple: (WGS84 longitudes, WGS84 latitudes)
+        """
+        out_lons = array("d", lons) if out_lons is None else out_lons
+        out_lats = array("d", lats) if out_lats is None else out_lats
+        convert = self.gcj02_to_wgs84
+        for i in range(len(lons)):
+            out_lons[i], out_lats[i] = convert(lons[i], lats[i], tolerance, max_iter)
+        return out_lons, out_lats
+
+    def distance(self, lon1, lat1, lon2, lat2):
+        """Get haversine distance of two points.
+
+        Returns:
+            float: distance, unit: m.
+        """
+        return self.distance_batch((lon1, lon2), (lat1, lat2))[0][0]
+
+    def bearing(self, lon1, lat1, lon2, lat2):
+        """Get initial bearing from point 1 to point 2.
+
+        Returns:
+            float: bearing, unit: degree, 0 ~ 360, clockwise from north.
+        """
+        return self.distance_batch((lon1, lon2), (lat1, lat2))[1][0]
+
+    def distance_batch(self, lons, lats, out_dist=None, out_bearing=None):
+        """Get haversine distance and bearing of every segment of a track.
+
+        Sine and cosine of each point latitude are computed once and shared by its two segments.
+
+        Args:
+            lons (list/tuple/array): longitudes of track points.
+            lats (list/tuple/array): latitudes of track points.
+            out_dist (array): output distances, length is number of points - 1. (default: new array("d"))
+            out_bearing (array): output bearings, length is number of points - 1. (default: new array("d"))
+
+        Returns:
+            tuple: (distances(m), bearings(degree))
+        """
+        n = len(lons) - 1 if len(lons) > 0 else 0
+        out_dist = array("d", bytes(8 * n)) if out_dist is None else out_dist
+        out_bearing = array("d", bytes(8 * n)) if out_bearing is None else out_bearing
+        if n <= 0:
+            return out_dist, out_bearing
+        sin, cos = math.sin, math.cos
+        rad = self._RAD
+        diameter = 2 * self.MEAN_EARTH_RADIUS * 1000
+        phi = lats[0] * rad
+        sin_phi = sin(phi)
+        cos_phi = cos(phi)
+        for i in range(n):
+            phi2 = lats[i + 1] * rad
+            sin_phi2 = sin(phi2)
+            cos_phi2 = cos(phi2)
+            d_lambda = (lons[i + 1] - lons[i]) * rad
+            sin_d_lambda = sin(d_lambda)
+            cos_d_lambda = cos(d_lambda)
+            h_phi = sin((phi2 - phi) * 0.5)
+            h_lambda = sin(d_lambda * 0.5)
+            h = h_phi * h_phi + cos_phi * cos_phi2 * h_lambda * h_lambda
+            out_dist[i] = diameter * math.asin(math.sqrt(min(1.0, h)))
+            theta = math.atan2(sin_d_lambda * cos_phi2, cos_phi * sin_phi2 - sin_phi * cos_phi2 * cos_d_lambda)
+            out_bearing[i] = (theta * self._DEG + 360.0) % 360.0
+            phi, sin_phi, cos_phi = phi2, sin_phi2, cos_phi2
+        return out_dist, out_bearing
+
+
+class GSVTable:
+    """This class is satellites in view table collected from GSV sequences of all constellations.
+
+    Satellites are kept in parallel arrays, a GSV sequence replaces the satellites of its constellation
+    and signal in place when its first sentence arrives, so no object is allocated per satellite.
+
+    Attributes:
+        system: constellation index in `SYSTEMS`.
+        signal: GNSS signal id (NMEA 4.11), 0 if not reported.
+        prn: satellite PRN.
+        elevation: elevation (degree), 0 if not reported.
+        azimuth: azimuth (degree), 0 if not reported.
+        snr: SNR (dB-Hz), 0 if not tracked.
+        count: number of satellites in the table.
+    """
+
+    SYSTEMS = ("GP", "GL", "GA", "GB", "GQ", "BD", "GI", "GN")
+
+    def __init__(self, size=64):
+        self.size = size
+        self.system = array("B", bytes(size))
+        self.signal = array("B", bytes(size))
+        self.prn = array("H", bytes(size * 2))
+        self.elevation = array("b", bytes(size))
+        self.azimuth = array("H", bytes(size * 2))
+        self.snr = array("B", bytes(size))
+        self.count = 0
+        self.__in_view = {}
+        self.__expect = {}
+
+    def __remove(self, system, signal):
+        """Remove the satellites of one constellation signal by compacting the arrays."""
+        j = 0
+        for i in range(self.count):
+            if self.system[i] != system or self.signal[i] != signal:
+                if i != j:
+                    self.system[j] = self.system[i]
+                    self.signal[j] = self.signal[i]
+                    self.prn[j] = self.prn[i]
+                    self.elevation[j] = self.elevation[i]
+                    self.azimuth[j] = self.azimuth[i]
+                    self.snr[j] = self.snr[i]
+                j += 1
+        self.count = j
+
+    def update(self, fields):
+        """Update table by one GSV sentence.
+
+        Args:
+            fields (tuple): GSV sentence fields, e.g. ("GPGSV", "4", "1", "13", "195", "67", "060", "30", ..., "1").
+        """
+        if fields[0][:2] not in self.SYSTEMS or len(fields) < 4:
+            return
+        system = self.SYSTEMS.index(fields[0][:2])
+        try:
+            total = int(fields[1])
+            num = int(fields[2])
+            signal = int(fields[-1] or "0", 16) if (len(fields) - 4) % 4 else 0
+            key = (system << 4) | signal
+            if num == 1:
+                self.__remove(system, signal)
+                self.__in_view[key] = int(fields[3] or 0)
+            elif self.__expect.get(key) != num:
+                # A sentence of this sequence is lost, wait for the next sequence.
+                return
+            self.__expect[key] = num + 1 if num < total else 0
+            for i in range(4, len(fields) - 3, 4):
+                if not fields[i] or self.count >= self.size:
+                    continue
+                n = self.count
+                self.system[n] = system
+                self.signal[n] = signal
+                self.prn[n] = int(fields[i])
+                self.elevation[n] = int(fields[i + 1] or 0)
+                self.azimuth[n] = int(fields[i + 2] or 0)
+                self.snr[n] = int(fields[i + 3] or 0)
+                self.count = n + 1
+        except ValueError:
+            pass
+
+    def in_view(self):
+        """Get the number of satellites in view of all constellations.
+
+        Returns:
+            int: satellites in view.
+        """
+        systems = {}
+        for key, num in self.__in_view.items():
+            if num > systems.get(key >> 4, 0):
+                systems[key >> 4] = num
+        return sum(systems.values())
+
+    def rows(self):
+        """Get satellites of the table.
+
+        Returns:
+            list: [(system, prn, elevation, azimuth, snr, signal), ...]
+        """
+        return [
+            (self.SYSTEMS[self.system[i]], self.prn[i], self.elevation[i], self.azimuth[i], self.snr[i], self.signal[i])
+            for i in range(self.count)
+        ]
+
+    def clear(self):
+        self.count = 0
+        self.__in_view.clear()
+        self.__expect.clear()
 
 
 class NMEAParse:
-    """This class is match and parse gps NEMA 0183"""
+    """This class is match and parse gps NEMA 0183
+
+    The buffer is walked once: sentences are framed at `$` / `*hh` / CRLF, the checksum is verified and
+    the fields of every supported sentence are kept as a record per talker and type (e.g. `GNRMC`).
+    All properties are views on these records, so reading them does not scan the buffer again.
+
+    Every RMC is also kept as an epoch with the GGA of the same UTC time, which the receiver may send before
+    or after the RMC. Once a GGA followed its RMC, the last RMC of a chunk waits for its GGA in the next chunk.
+    """
+
+    # Sentence type -> talkers accepted by the `GxXXX` properties.
+    _TALKERS = {
+        "RMC": ("GN", "GP"),
+        "GGA": ("GB", "GL", "GP", "GN"),
+        "VTG": ("GN", "GP"),
+        "GSV": ("GN", "GP"),
+        "GLL": ("GN", "GP"),
+        "GSA": ("GN", "GP"),
+    }
+
+    # Max size of an unterminated sentence carried over to the next `feed`.
+    _FRAGMENT_MAX = 256
+    # Size of the stream buffer, larger chunks are parsed in several passes.
+    _BUFFER_SIZE = 1024
 
     def __init__(self):
-        self.__gps_data = ""
+        self.__records = {}
+        self.__latest = {}
+        self.__updated = set()
+        self.__gsv = GSVTable()
+        self.__buf = bytearray(self._BUFFER_SIZE)
+        self.__buf_view = memoryview(self.__buf)
+        self.__buf_len = 0
+        self.__stats = {
+            "good": 0,
+            "bad_checksum": 0,
+            "dropped": 0,
+        }
+        self.__proprietary = None
+        self.__epochs = []
+        self.__pending = None
+        self.__gga = ()
+        self.__gga_after = False
+
+    def __reset(self):
+        self.__records.clear()
+        self.__latest.clear()
+        self.__buf_len = 0
+        self.__gsv.clear()
+        del self.__epochs[:]
+        self.__pending = None
+        self.__gga = ()
+        self.__gga_after = False
+
+    def __epoch(self, stype, fields):
+        """Pair RMC and GGA of the same UTC time into epochs."""
+        pending = self.__pending
+        if stype == "RMC":
+            if pending is not None:
+                self.__epochs.append(pending)
+            if self.__gga and self.__gga[1] == fields[1]:
+                self.__epochs.append((fields, self.__gga))
+                self.__pending = None
+            else:
+                self.__pending = (fields, ())
+        else:
+            self.__gga = fields
+            if pending is not None and pending[0][1] == fields[1]:
+                self.__epochs.append((pending[0], fields))
+                self.__pending = None
+                self.__gga_after = True
+
+    def __flush_epoch(self):
+        if self.__pending is not None:
+            self.__epochs.append(self.__pending)
+            self.__pending = None
+
+    def __sentence(self, data, start, end):
+        """Verify and record one sentence.
+
+        Args:
+            data (bytes/bytearray): nmea buffer.
+            start (int): index of `$`.
+            end (int): index of the line terminator (exclusive).
+        """
+        try:
+            sid = data[start + 1:start + 6].decode()
+            proprietary = self.__proprietary is not None and sid[0] == "P"
+            if not proprietary and sid[2:] not in self._TALKERS:
+                return
+            star = data.find(b"*", start, end)
+            if star < 0 or end - star < 3:
+                self.__stats["dropped"] += 1
+                return
+            checksum = 0
+            for c in memoryview(data)[start + 1:star]:
+                checksum ^= c
+            if int(data[star + 1:star + 3], 16) != checksum:
+                self.__stats["bad_checksum"] += 1
+                return
+            sentence = data[start:star + 3].decode()
+        except (ValueError, UnicodeError):
+            self.__stats["bad_checksum"] += 1
+            return
+        if proprietary:
+            self.__proprietary(tuple(sentence[1:-3].split(",")))
+            return
+        stype = sid[2:]
+        self.__records[sid] = (sentence, tuple(sentence[1:-3].split(",")))
+        if stype == "GSV":
+            self.__gsv.update(self.__records[sid][1])
+        if sid[:2] in self._TALKERS[stype]:
+            self.__latest[stype] = sid
+            self.__updated.add(stype)
+            if stype in ("RMC", "GGA"):
+                self.__epoch(stype, self.__records[sid][1])
+        self.__stats["good"] += 1
+
+    def __tokenize(self, data, end, final=True):
+        """Walk the buffer once and record every complete sentence.
 
-    def __parse(self, nmea):
-        return tuple(nmea[1:].split("*")[0].split(",")) if nmea else ()
+        Args:
+            data (bytes/bytearray): nmea buffer.
+            end (int): length of valid data in the buffer.
+            final (bool): True - the buffer end terminates the last sentence,
+                          False - the last unterminated sentence is kept as a fragment.
+
+        Returns:
+            int: start index of the unterminated sentence, `end` if there is none.
+        """
+        pos = data.find(b"$", 0, end)
+        while pos >= 0:
+            nxt = data.find(b"$", pos + 1, end)
+            eol = data.find(b"\n", pos + 1, end)
+            if eol < 0 and nxt < 0:
+                if not final:
+                    return pos
+                eol = end
+            elif eol < 0 or 0 <= nxt < eol:
+                # Sentence interrupted by the next `$`.
+                self.__stats["dropped"] += 1
+                pos = nxt
+                continue
+            self.__sentence(data, pos, eol)
+            pos = nxt
+        return end
+
+    def __view(self, stype):
+        sid = self.__latest.get(stype)
+        return self.__records[sid] if sid else ("", ())
 
     def set_gps_data(self, gps_data):
-        self.__gps_data = gps_data.decode() if isinstance(gps_data, bytes) else gps_data
+        self.__reset()
+        if gps_data:
+            data = gps_data.encode() if isinstance(gps_data, str) else gps_data
+            self.__tokenize(data, len(data))
+            self.__flush_epoch()
+
+    def feed(self, gps_data):
+        """Parse a chunk of a continuous nmea stream.
+
+        The unterminated sentence at the end of the chunk is kept and completed by the next chunk.
+        Records of earlier chunks are kept until they are replaced by newer sentences.
+
+        Args:
+            gps_data (str/bytes/bytearray/memoryview): gnss nmea data, it is copied into the parser buffer.
+
+        Returns:
+            set: sentence types (e.g. `RMC`) updated by this chunk.
+        """
+        self.__updated.clear()
+        del self.__epochs[:]
+        if gps_data:
+            data = memoryview(gps_data.encode() if isinstance(gps_data, str) else gps_data)
+            buf, view = self.__buf, self.__buf_view
+            pos = 0
+            while pos < len(data):
+                # Append the chunk after the fragment, then move the new fragment to the buffer head.
+                size = min(len(data) - pos, len(buf) - self.__buf_len)
+                end = self.__buf_len + size
+                view[self.__buf_len:end] = data[pos:pos + size]
+                pos += size
+                tail = self.__tokenize(buf, end, final=False)
+                self.__buf_len = end - tail
+                if self.__buf_len > self._FRAGMENT_MAX:
+                    self.__buf_len = 0
+                    self.__stats["dropped"] += 1
+                elif self.__buf_len and tail:
+                    view[:self.__buf_len] = view[tail:end]
+        if not self.__gga_after:
+            self.__flush_epoch()
+        return self.__updated
+
+    def epochs(self):
+        """Get the epochs completed by the last `feed` or `set_gps_data`, oldest first.
+
+        Returns:
+            list: [(RMC fields, GGA fields of the same UTC time or ()), ...], valid until the next call.
+        """
+        return self.__epochs
+
+    def set_proprietary_callback(self, callback):
+        """Set callback of proprietary sentences (`$P...`), e.g. command acknowledgements.
+
+        Args:
+            callback (function): callback(fields), None - ignore proprietary sentences.
+        """
+        self.__proprietary = callback
+
+    def stats(self):
+        """Get sentence counters of the supported sentence types.
+
+        Returns:
+            dict: {"good": int, "bad_checksum": int, "dropped": int}
+        """
+        return dict(self.__stats)
+
+    def record(self, sid):
+        """Get the parsed record of one talker and sentence type.
+
+        Args:
+            sid (str): talker and sentence type, e.g. `GNRMC`, `BDGSV`.
+
+        Returns:
+            tuple: (sentence, fields), ("", ()) if not received.
+        """
+        return self.__records.get(sid, ("", ()))
 
     @property
     def GxRMC(self):
-        if self.__gps_data:
-            rmc_re = ure.search(
-                r"\$G[NP]RMC,\d*\.*\d*,*[AV],*\d*\.*\d*,*[NS],*\d*\.*\d*,*[EW],*\d*\.*\d*,*\d*\.*\d*,*\d*,*\d*\.*\d*,*[EW]*,*[ADEN]*,*[SCUV]*\**(\d|\w)*",
-                self.__gps_data)
-            if rmc_re:
-                return rmc_re.group(0)
-        return ""
+        return self.__view("RMC")[0]
 
     @property
     def GxGGA(self):
-        if self.__gps_data:
-            gga_re = ure.search(
-                r"\$G[BLPN]GGA,\d*\.*\d*,*\d*\.*\d*,*[NS],*\d*\.*\d*,*[EW],*[0126],*\d*,*\d*\.*\d*,*-*\d*\.*\d*,*M,*-*\d*\.*\d*,*M,*\d*,*\**(\d|\w)*",
-                self.__gps_data)
-            if gga_re:
-                return gga_re.group(0)
-        return ""
+        return self.__view("GGA")[0]
 
     @property
     def GxVTG(self):
-        if self.__gps_data:
-            vtg_re = ure.search(
-                r"\$G[NP]VTG,\d*\.*\d*,*T,*\d*\.*\d*,*M,*\d*\.*\d*,*N,*\d*\.*\d*,*K,*[ADEN]*\*(\d|\w)*",
-                self.__gps_data)
-            if vtg_re:
-                return vtg_re.group(0)
-        return ""
+        return self.__view("VTG")[0]
 
     @property
     def GxGSV(self):
-        if self.__gps_data:
-            gsv_re = ure.search(
-                r"\$G[NP]GSV,\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*\**(\d|\w)*",
-                self.__gps_data)
-            if gsv_re:
-                return gsv_re.group(0)
-        return ""
+        return self.__view("GSV")[0]
 
     @property
     def GxGLL(self):
-        if self.__gps_data:
-            gll_re = ure.search(
-                r"\$G[NP]GLL,\d*\.*\d*,*[NS]*,*\d*\.*\d*,*[EW]*,*\d*\.*\d*,*[AV]*,*[ADEN]*\**(\d|\w)*",
-                self.__gps_data)
-            if gll_re:
-                return gll_re.group(0)
+        return self.__view("GLL")[0]
 
     @property
     def GxGSA(self):
-        if self.__gps_data:
-            gsa_re = ure.search(
-                r"\$G[NP]GSA,[MA]*,*[123]*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*,*\d*\.*\d*,*\d*\.*\d*,*\d*\.*\d*,*(\d|\w)*\**(\d|\w)*",
-                self.__gps_data)
-            if gsa_re:
-                return gsa_re.group(0)
+        return self.__view("GSA")[0]
 
     @property
     def GxRMCData(self):
@@ -167,27 +655,36 @@ class NMEAParse:
                 ground rate, ground heading, UTC date, magnetic declination, Magnetic declination direction, Mode indication
             )
         """
-        return self.__parse(self.GxRMC)
+        return self.__view("RMC")[1]
 
     @property
     def GxGGAData(self):
-        return self.__parse(self.GxGGA)
+        return self.__view("GGA")[1]
 
     @property
     def GxGSVData(self):
-        return self.__parse(self.GxGSV)
+        return self.__view("GSV")[1]
 
     @property
     def GxGSAData(self):
-        return self.__parse(self.GxGSA)
+        return self.__view("GSA")[1]
 
     @property
     def GxVTGData(self):
-        return self.__parse(self.GxVTG)
+        return self.__view("VTG")[1]
 
     @property
     def GxGLLData(self):
-        return self.__parse(self.GxGLL)
+        return self.__view("GLL")[1]
+
+    @property
+    def Satellites(self):
+        """Satellites in view table of all constellations.
+
+        Returns:
+            GSVTable: satellites table.
+        """
+        return self.__gsv
 
     @property
     def Latitude(self):
@@ -222,6 +719,234 @@ class NMEAParse:
         return speed
 
 
+class LocationHistory:
+    """This class is fixed size ring buffer of GNSS fixes.
+
+    Fields are kept in preallocated parallel arrays, latitude and longitude as micro-degrees,
+    so a fix costs 29 bytes and appending one does not allocate memory.
+    """
+
+    def __init__(self, size=10):
+        self.__size = 0
+        self.__count = 0
+        self.__head = 0
+        self.resize(size)
+
+    def __len__(self):
+        return self.__count
+
+    def __index(self, i):
+        """Get array index of the i-th fix, 0 is the oldest one."""
+        return (self.__head - self.__count + i) % self.__size
+
+    def resize(self, size):
+        """Set ring buffer size, the latest fixes are kept.
+
+        Args:
+            size (int): max number of fixes.
+        """
+        keep = [self.get(i) for i in range(max(0, self.__count - size), self.__count)]
+        self.__size = size
+        self.__time = array("i", bytes(4 * size))
+        self.__lat = array("i", bytes(4 * size))
+        self.__lng = array("i", bytes(4 * size))
+        self.__speed = array("f", bytes(4 * size))
+        self.__course = array("f", bytes(4 * size))
+        self.__altitude = array("f", bytes(4 * size))
+        self.__hdop = array("f", bytes(4 * size))
+        self.__satellites = array("B", bytes(size))
+        self.__count = 0
+        self.__head = 0
+        for fix in keep:
+            self.append(fix)
+
+    def append(self, fix):
+        """Append a fix, the oldest fix is overwritten when the buffer is full.
+
+        Args:
+            fix (GNSSFix): gnss fix.
+        """
+        i = self.__head
+        self.__time[i] = int(fix.time)
+        self.__lat[i] = int(round(fix.lat * 1000000))
+        self.__lng[i] = int(round(fix.lng * 1000000))
+        self.__speed[i] = fix.speed
+        self.__course[i] = fix.course
+        self.__altitude[i] = fix.altitude
+        self.__hdop[i] = fix.hdop
+        self.__satellites[i] = min(fix.satellites, 255)
+        self.__head = (i + 1) % self.__size
+        if self.__count < self.__size:
+            self.__count += 1
+
+    def get(self, i):
+        """Get the i-th fix, 0 is the oldest one, -1 is the latest one.
+
+        Returns:
+            GNSSFix: gnss fix.
+        """
+        i = self.__index(i if i >= 0 else self.__count + i)
+        return GNSSFix(
+            self.__time[i], self.__lat[i] / 1000000, self.__lng[i] / 1000000, self.__speed[i],
+            self.__course[i], self.__altitude[i], self.__hdop[i], self.__satellites[i]
+        )
+
+    def last(self, count=None):
+        """Get the latest fixes.
+
+        Args:
+            count (int): number of fixes, all fixes if None. (default: None)
+
+        Returns:
+            list: GNSSFix list, oldest first.
+        """
+        count = self.__count if count is None else max(0, min(count, self.__count))
+        return [self.get(i) for i in range(self.__count - count, self.__count)]
+
+    def since(self, timestamp):
+        """Get fixes not older than timestamp.
+
+        Args:
+            timestamp (int): UTC time, `utime.mktime` seconds.
+
+        Returns:
+            list: GNSSFix list, oldest first.
+        """
+        count = 0
+        while count < self.__count and self.__time[self.__index(self.__count - count - 1)] >= timestamp:
+            count += 1
+        return self.last(count)
+
+    def clear(self):
+        self.__count = 0
+        self.__head = 0
+
+
+class GNSSDialect:
+    """This class is the base of receiver command dialects.
+
+    A dialect builds the command bodies (between `$` and `*`) for the output rate and the nmea sentence
+    output, and matches the acknowledgement sentences of the receiver.
+    """
+
+    NAME = ""
+    # Sentences whose output can be configured.
+    SENTENCES = ("GGA", "GLL", "GSA", "GSV", "RMC", "VTG", "ZDA")
+
+    def rate(self, interval):
+        """Build commands of the fix interval.
+
+        Args:
+            interval (int): fix interval (ms).
+
+        Returns:
+            list: command bodies.
+        """
+        return []
+
+    def output(self, sentences):
+        """Build commands of the sentence output.
+
+        Args:
+            sentences (dict): {sentence type: output every n fixes}, types not in it are disabled.
+
+        Returns:
+            list: command bodies.
+        """
+        return []
+
+    def aid(self, fix, utc):
+        """Build hot start aiding commands.
+
+        Args:
+            fix (GNSSFix): saved fix.
+            utc (tuple): current UTC time, `utime.localtime` format.
+
+        Returns:
+            list: command bodies.
+        """
+        return []
+
+    def ack(self, command, fields):
+        """Match an acknowledgement.
+
+        Args:
+            command (str): command body sent.
+            fields (tuple): fields of a received proprietary sentence.
+
+        Returns:
+            bool: True - accepted, False - rejected, None - not the acknowledgement of this command.
+        """
+        return None
+
+
+class MTKDialect(GNSSDialect):
+    """MTK PMTK commands, acknowledged by `PMTK001,<command>,3`."""
+
+    NAME = "MTK"
+
+    def rate(self, interval):
+        return ["PMTK220,%d" % interval]
+
+    def output(self, sentences):
+        rates = [sentences.get(name, 0) for name in ("GLL", "RMC", "VTG", "GGA", "GSA", "GSV")]
+        return ["PMTK314,%s,0,0,0,0,0,0,0,0,0,0,0,%d,0" % (",".join(str(i) for i in rates), sentences.get("ZDA", 0))]
+
+    def aid(self, fix, utc):
+        return [
+            "PMTK740,%d,%d,%d,%d,%d,%d" % tuple(utc[:6]),
+            "PMTK741,%.6f,%.6f,%d,%d,%d,%d,%d,%d,%d" % ((fix.lat, fix.lng, int(fix.altitude)) + tuple(utc[:6])),
+        ]
+
+    def ack(self, command, fields):
+        if len(fields) < 3 or fields[0] != "PMTK001" or fields[1] != command[4:7]:
+            return None
+        return fields[2] == "3"
+
+
+class PAIRDialect(GNSSDialect):
+    """Airoha PAIR commands, acknowledged by `PAIR001,<command>,0`."""
+
+    NAME = "PAIR"
+
+    # Sentence type -> PAIR062 message type.
+    _TYPES = {"GGA": 0, "GLL": 1, "GSA": 2, "GSV": 3, "RMC": 4, "VTG": 5, "ZDA": 6}
+
+    def rate(self, interval):
+        return ["PAIR050,%d" % interval]
+
+    def output(self, sentences):
+        return ["PAIR062,%d,%d" % (self._TYPES[name], sentences.get(name, 0)) for name in self.SENTENCES]
+
+    def ack(self, command, fields):
+        if len(fields) < 3 or fields[0] != "PAIR001" or fields[1] != command[4:7]:
+            return None
+        return fields[2] == "0"
+
+
+class PQDialect(PAIRDialect):
+    """Quectel PQTM commands, acknowledged by `<command>,OK`, the fix interval uses PAIR."""
+
+    NAME = "PQ"
+
+    def output(self, sentences):
+        return ["PQTMCFGMSGRATE,W,%s,%d" % (name, sentences.get(name, 0)) for name in self.SENTENCES]
+
+    def ack(self, command, fields):
+        if command.startswith("PAIR"):
+            return super().ack(command, fields)
+        if len(fields) < 2 or fields[0] != command.split(",", 1)[0]:
+            return None
+        return fields[1] == "OK"
+
+
+GNSS_DIALECTS = {
+    MTKDialect.NAME: MTKDialect,
+    PAIRDialect.NAME: PAIRDialect,
+    PQDialect.NAME: PQDialect,
+}
+
+
 class GNSSPower:
     """This class is for GNSS power control.
 
@@ -304,6 +1029,12 @@ class GNSSPower:
 class GNSSBase(GNSSPower):
     """This class is GNSS module base class."""
 
+    # Poll interval range of the adaptive poll (ms).
+    _POLL_MIN = 20
+    _POLL_MAX = 1000
+    # TTFF samples kept.
+    _TTFF_SAMPLES = 8
+
     def __init__(self, PowerPin=None, StandbyPin=None, BackupPin=None):
         super().__init__(PowerPin, StandbyPin, BackupPin)
         self.__nmea_parse = NMEAParse()
@@ -324,11 +1055,27 @@ class GNSSBase(GNSSPower):
             "altitude": "",
             "satellites": "",
         }
-        self.__hist_locs = []
-        self.__hist_size = 10
+        self.__hist_locs = LocationHistory(10)
         self.__current_nmea = b""
         self.__trans = 0
         self.__trans_output = print
+        self.__rx_mode = 1
+        self.__epoch_tick = None
+        self.__epoch_ms = self._POLL_MAX
+        self.__last_fix = None
+        self.__subscribers = {}
+        self.__subscriber_id = 0
+        self.__csc = CoordinateSystemConvert()
+        self.__config = {}
+        self.__state_file = None
+        self.__state_period = 0
+        self.__state_saved = None
+        self.__saved_state = None
+        self.__last_fix_rtc = 0
+        self.__start_tick = None
+        self.__ttff = array("i", bytes(4 * self._TTFF_SAMPLES))
+        self.__ttff_count = 0
+        self.__acks = []
 
     def _open(self):
         """Open gnss."""
@@ -342,21 +1089,100 @@ class GNSSBase(GNSSPower):
         """Receive gnss nmea data."""
         pass
 
+    def _wakeup(self):
+        """Wake up the receiving thread waiting for data."""
+        pass
+
+    def _send(self, data):
+        """Send a command to the receiver.
+
+        Args:
+            data (str/bytes): command.
+
+        Returns:
+            bool: True - success, False - not supported or failed.
+        """
+        return False
+
+    def _aid(self):
+        """Send hot start aiding and the saved configuration, called by the receiving thread after `_open`.
+
+        The aiding is the time and position of the saved fix in the configured dialect (MTK if not configured),
+        the current UTC time is the saved fix time plus the RTC time passed since the fix. The configuration
+        is sent without waiting for acknowledgements, which are parsed by this thread.
+        """
+        config = self.__config
+        dialect = GNSS_DIALECTS.get(config.get("dialect"), MTKDialect)()
+        state = self.__saved_state
+        if state and state.get("fix"):
+            fix = GNSSFix(*state["fix"])
+            elapsed = utime.time() - state.get("rtc", 0)
+            if fix.time > 0 and elapsed >= 0:
+                for command in dialect.aid(fix, utime.localtime(fix.time + elapsed)):
+                    self._send(nmea_sentence(command))
+        if config.get("rate"):
+            for command in dialect.rate(config["rate"]):
+                self._send(nmea_sentence(command))
+        if config.get("sentences"):
+            for command in dialect.output(config["sentences"]):
+                self._send(nmea_sentence(command))
+
+    def __on_proprietary(self, fields):
+        self.__acks.append(fields)
+
+    def __command(self, dialect, command, timeout, retry):
+        """Send a command and wait for its acknowledgement."""
+        for _ in range(retry + 1):
+            self.__acks = []
+            if not self._send(nmea_sentence(command)):
+                return False
+            start = utime.ticks_ms()
+            checked = 0
+            while utime.ticks_diff(utime.ticks_ms(), start) < timeout:
+                acks = self.__acks
+                while checked < len(acks):
+                    res = dialect.ack(command, acks[checked])
+                    checked += 1
+                    if res is not None:
+                        return res
+                utime.sleep_ms(20)
+            log.debug("%s not acknowledged.", command)
+        return False
+
+    def _poll_interval(self):
+        """Get interval before next read.
+
+        In event mode it is a quarter of the receiver output period measured by RMC arrivals,
+        so a sentence waits for at most a quarter period before it is parsed.
+
+        Returns:
+            int: interval (ms).
+        """
+        if self.__rx_mode == 0:
+            return 1000
+        return min(max(self.__epoch_ms // 4, self._POLL_MIN), self._POLL_MAX)
+
     def _parse_loc(self, gps_data):
         """Parse gnss nmea data.
 
         Args:
-            gps_data (str/bytes): gnss nmea data.
+            gps_data (str/bytes/memoryview): gnss nmea data.
         """
         if not gps_data:
             return
         if self.__trans:
-            self.__trans_output(gps_data)
-        self.__current_nmea = gps_data
-        self.__nmea_parse.set_gps_data(gps_data)
-        rmc_data = self.__nmea_parse.GxRMCData
-        if rmc_data and rmc_data[2] == "A":
-            with self.__lock:
+            self.__trans_output(bytes(gps_data) if isinstance(gps_data, memoryview) else gps_data)
+        fixes = []
+        with self.__lock:
+            # A memoryview is kept as is and copied by `read`, the receive buffer it refers to is not reused by the next read.
+            self.__current_nmea = gps_data
+            updated = self.__nmea_parse.feed(gps_data)
+            if "RMC" in updated:
+                self.__update_epoch()
+            # A chunk may hold several epochs, each valid one is a fix.
+            for rmc_data, gga_data in self.__nmea_parse.epochs():
+                if rmc_data[2] != "A":
+                    continue
                 self.__current_loc["timestamp"] = rmc_data[1]
                 self.__current_loc["state"] = rmc_data[2]
                 # self.__current_loc["lat"] = rmc_data[3]
@@ -371,17 +1197,97 @@ class GNSSBase(GNSSPower):
                     self.__current_loc["speed"] = None
                 self.__current_loc["course"] = rmc_data[8]
                 self.__current_loc["datestamp"] = rmc_data[9]
-                gga_data = self.__nmea_parse.GxGGAData
                 if len(gga_data) >= 10:
                     self.__current_loc["altitude"] = gga_data[9]
                 else:
                     self.__current_loc["altitude"] = None
-                gsv_data = self.__nmea_parse.GxGSVData
-                self.__current_loc["satellites"] = gsv_data[3]
+                self.__current_loc["satellites"] = str(self.__nmea_parse.Satellites.in_view())
+                fix = self.__last_fix = self.__fix(rmc_data, gga_data)
+                self.__hist_locs.append(fix)
+                fixes.append(fix)
+            if fixes:
+                self.__last_fix_rtc = utime.time()
+                subscribers = list(self.__subscribers.values())
+                if self.__start_tick is not None:
+                    self.__ttff[self.__ttff_count % self._TTFF_SAMPLES] = utime.ticks_diff(utime.ticks_ms(), self.__start_tick)
+                    self.__ttff_count += 1
+                    self.__start_tick = None
+
+        if fixes and self.__state_period and (
+            self.__state_saved is None or utime.ticks_diff(utime.ticks_ms(), self.__state_saved) >= self.__state_period
+        ):
+            self.save_state()
+
+        if fixes and subscribers:
+            for fix in fixes:
+                self.__notify(fix, subscribers)
+
+    def __update_epoch(self):
+        """Estimate receiver output period by RMC arrivals."""
+        now = utime.ticks_ms()
+        if self.__epoch_tick is not None:
+            period = utime.ticks_diff(now, self.__epoch_tick)
+            if 0 < period <= self._POLL_MAX * 2:
+                self.__epoch_ms = (self.__epoch_ms * 3 + period) // 4
+        self.__epoch_tick = now
+
+    def __fix(self, rmc_data, gga_data):
+        """Build a GNSSFix from the current location and the GGA sentence of its epoch."""
+        loc = self.__current_loc
+        try:
+            date = loc["datestamp"]
+            utc = loc["timestamp"]
+            timestamp = utime.mktime((
+                2000 + int(date[4:6]), int(date[2:4]), int(date[:2]), int(utc[:2]), int(utc[2:4]), int(utc[4:6]), 0, 0
+            ))
+        except (ValueError, IndexError):
+            timestamp = 0
+        return GNSSFix(
+            timestamp,
+            float(loc["lat"]) * (-1 if loc["lat_dir"] == "S" else 1),
+            float(loc["lng"]) * (-1 if loc["lng_dir"] == "W" else 1),
+            _float(loc["speed"]),
+            _float(loc["course"]),
+            _float(loc["altitude"]),
+            _float(gga_data[8] if len(gga_data) > 8 else None),
+            self.__nmea_parse.Satellites.in_view(),
+        )
+
+    def __notify(self, fix, subscribers):
+        """Deliver a new fix to the subscribers whose filters pass."""
+        for sub in subscribers:
+            callback, distance, interval, heading, hdop, last = sub
+            if hdop and (fix.hdop <= 0 or fix.hdop > hdop):
+                continue
+            if last is not None and (distance or interval or heading):
+                if not (
+                    (distance and self.__csc.distance(last.lng, last.lat, fix.lng, fix.lat) >= distance)
+                    or (interval and fix.time - last.time >= interval)
+                    or (heading and abs((fix.course - last.course + 180) % 360 - 180) >= heading)
+                ):
+                    continue
+            sub[5] = fix
+            try:
+                callback(fix)
+            except Exception as e:
+                sys.print_exception(e)
 
-        if len(self.__hist_locs) >= self.__hist_size:
-            self.__hist_locs.pop(0)
-        self.__hist_locs.append(self.__current_loc)
+    def __loc(self, fix):
+        """Convert a GNSSFix to the location data keys of `read`, values formatted from the stored fix."""
+        t = utime.localtime(fix.time)
+        return {
+            "timestamp": "%02d%02d%02d.000" % (t[3], t[4], t[5]),
+            "state": "A",
+            "lat": "%.6f" % abs(fix.lat),
+            "lat_dir": "S" if fix.lat < 0 else "N",
+            "lng": "%.6f" % abs(fix.lng),
+            "lng_dir": "W" if fix.lng < 0 else "E",
+            "speed": "%.3f" % fix.speed,
+            "course": "%.2f" % fix.course,
+            "datestamp": "%02d%02d%02d" % (t[2], t[1], t[0] % 100),
+            "altitude": "%.3f" % fix.altitude,
+            "satellites": str(fix.satellites),
+        }
 
     def set_trans(self, mode, output=print):
         """Set transparent tag for weather to print gnss nmae or not.
@@ -394,6 +1300,107 @@ class GNSSBase(GNSSPower):
         self.__trans = mode
         self.__trans_output = output
 
+    def set_state_file(self, path, period=600):
+        """Enable hot start state persistence.
+
+        The last fix, its UTC time and the receiver configuration are saved to the file every `period` seconds
+        and on `stop`. The saved state is loaded now: the saved fix is served by `last_fix` until a new fix
+        arrives, and its time and position are sent to the receiver as start aiding.
+
+        Args:
+            path (str): state file path.
+            period (int): save period (s), 0 - save on `stop` and `save_state` only. (default: 600)
+
+        Returns:
+            bool: True - a saved state is loaded, False - no saved state.
+        """
+        self.__state_file = path
+        self.__state_period = period * 1000
+        state = ql_fs.read_json(path) if ql_fs.path_exists(path) else None
+        if not isinstance(state, dict) or not state.get("fix"):
+            return False
+        self.__saved_state = state
+        with self.__lock:
+            if self.__last_fix is None:
+                self.__last_fix = GNSSFix(*state["fix"])
+                self.__last_fix_rtc = state.get("rtc", 0)
+            self.__config.update(state.get("config") or {})
+        return True
+
+    def save_state(self):
+        """Save the last fix, its UTC time and the receiver configuration to the state file.
+
+        Returns:
+            bool: True - success, False - failed or no state file.
+        """
+        if not self.__state_file or self.__last_fix is None:
+            return False
+        with self.__lock:
+            state = {"fix": list(self.__last_fix), "rtc": self.__last_fix_rtc, "config": dict(self.__config)}
+        self.__state_saved = utime.ticks_ms()
+        if state == self.__saved_state:
+            return True
+        self.__saved_state = state
+        try:
+            return ql_fs.touch(self.__state_file, state) == 0
+        except Exception as e:
+            sys.print_exception(e)
+            return False
+
+    def configure(self, dialect, sentences=None, rate=None, timeout=1000, retry=1):
+        """Configure the receiver output and check the acknowledgements.
+
+        The reading thread must be running, it captures the acknowledgements from the nmea stream. On success
+        the configuration is kept, resent after each `_open` and saved by `save_state`.
+
+        Args:
+            dialect (str/GNSSDialect): command dialect, `MTK` / `PAIR` / `PQ` or a GNSSDialect object.
+            sentences (dict): {sentence type: output every n fixes}, e.g. {"RMC": 1, "GGA": 1, "GSV": 5},
+                              types not in it are disabled, None - not changed. (default: None)
+            rate (int): fix interval (ms), None - not changed. (default: None)
+            timeout (int): acknowledgement timeout of one command (ms). (default: 1000)
+            retry (int): retries of a command without acknowledgement. (default: 1)
+
+        Returns:
+            bool: True - all commands are accepted, False - failed.
+        """
+        if isinstance(dialect, str):
+            dialect = GNSS_DIALECTS[dialect]()
+        if not self.__running:
+            return False
+        commands = []
+        if rate:
+            commands.extend(dialect.rate(rate))
+        if sentences is not None:
+            commands.extend(dialect.output(sentences))
+        self.__nmea_parse.set_proprietary_callback(self.__on_proprietary)
+        try:
+            res = True
+            for command in commands:
+                res = self.__command(dialect, command, timeout, retry) and res
+        finally:
+            self.__nmea_parse.set_proprietary_callback(None)
+        if res:
+            with self.__lock:
+                if self.__config.get("dialect") != dialect.NAME:
+                    self.__config.clear()
+                self.__config["dialect"] = dialect.NAME
+                if rate:
+                    self.__config["rate"] = rate
+                if sentences is not None:
+                    self.__config["sentences"] = dict(sentences)
+        return res
+
+    def ttff(self):
+        """Get time to first fix samples, measured from `start` to the first valid RMC.
+
+        Returns:
+            list: latest samples (ms), oldest first.
+        """
+        count = min(self.__ttff_count, self._TTFF_SAMPLES)
+        start = self.__ttff_count - count
+        return [self.__ttff[(start + i) % self._TTFF_SAMPLES] for i in range(count)]
+
     def set_back_size(self, size):
         """Set history location data backup size.
 
@@ -401,19 +1408,109 @@ class GNSSBase(GNSSPower):
             size(int): History location data backup size.
         """
         assert isinstance(size, int) and size > 0, "History location data size must be int and larger than 0."
-        self.__hist_size = size
+        with self.__lock:
+            self.__hist_locs.resize(size)
+
+    def set_rx_mode(self, mode):
+        """Set how the receiving thread waits for nmea data.
+
+        Args:
+            mode (int): 0 - read once per second,
+                        1 - event mode, UART gnss reads on UART RX callback, internal and I2C gnss poll
+                            at a quarter of the receiver output period. (default: 1)
+        """
+        assert mode in (0, 1), "rx mode must be 0 or 1."
+        self.__rx_mode = mode
+        self._wakeup()
+
+    def get_rx_mode(self):
+        return self.__rx_mode
+
+    def nmea_stats(self):
+        """Get nmea sentence counters of this gnss source.
+
+        Returns:
+            dict: {"good": int, "bad_checksum": int, "dropped": int}
+        """
+        return self.__nmea_parse.stats()
+
+    def subscribe(self, callback, distance=0, interval=0, heading=0, hdop=0):
+        """Subscribe gnss fixes.
+
+        The callback is called in the gnss thread with a new fix when it meets the quality threshold and,
+        if any of distance / interval / heading is set, when one of them passes against the last fix delivered
+        to this callback. Without movement filters every fix meeting the quality threshold is delivered.
+
+        Args:
+            callback (function): callback(fix), fix is a GNSSFix.
+            distance (float): min distance moved (m). (default: 0, disable)
+            interval (int): min interval (s). (default: 0, disable)
+            heading (float): min course change (degree). (default: 0, disable)
+            hdop (float): max HDOP of a delivered fix. (default: 0, disable)
+
+        Returns:
+            int: subscription id.
+        """
+        assert callable(callback), "callback must be callable."
+        with self.__lock:
+            self.__subscriber_id += 1
+            self.__subscribers[self.__subscriber_id] = [callback, distance, interval, heading, hdop, None]
+            return self.__subscriber_id
+
+    def unsubscribe(self, sid):
+        """Cancel a subscription.
+
+        Args:
+            sid (int): subscription id returned by `subscribe`.
+
+        Returns:
+            bool: True - success, False - subscription not exists.
+        """
+        with self.__lock:
+            return self.__subscribers.pop(sid, None) is not None
+
+    def last_fix(self):
+        """Get the latest fix.
+
+        Returns:
+            GNSSFix: latest fix, None if there is no fix.
+        """
+        return self.__last_fix
+
+    def read_history(self, count=None, since=None):
+        """Read history fixes.
+
+        Args:
+            count (int): number of the latest fixes, all fixes if None. (default: None)
+            since (int): only fixes not older than this UTC time, `utime.mktime` seconds. (default: None)
+
+        Returns:
+            list: GNSSFix list, oldest first.
+        """
+        with self.__lock:
+            fixes = self.__hist_locs.last(count) if since is None else self.__hist_locs.since(since)
+            return fixes if since is None or count is None else fixes[max(0, len(fixes) - count):]
 
     def read(self, mode=0):
         """Read gnss data.
 
         Args:
-            mode (int): 0 - current loction data, 1 - history location datas(max numbers is 10) (default: `0`)
+            mode (int): 0 - current loction data, 1 - history location datas(max numbers is `set_back_size`, same keys
+                        as mode 0 with values formatted from the stored fixes),
+                        2 - latest nmea data, 3 - satellites in view of all constellations (default: `0`)
 
         Returns:
-            dict/list: location data.
+            dict/list/bytes: location data.
+                mode 3: [(system, prn, elevation, azimuth, snr, signal), ...]
         """
         with self.__lock:
-            return self.__current_loc if mode == 0 else (self.__hist_locs if mode == 1 else self.__current_nmea)
+            if mode == 3:
+                return self.__nmea_parse.Satellites.rows()
+            if mode == 1:
+                return [self.__loc(fix) for fix in self.__hist_locs.last()]
+            if mode == 0:
+                return dict(self.__current_loc)
+            return bytes(self.__current_nmea) if isinstance(self.__current_nmea, memoryview) else self.__current_nmea
 
     def start(self):
         """Start a thread for reading and parsing gnss nmea data.
@@ -427,6 +1524,7 @@ class GNSSBase(GNSSPower):
                 if not self.__tid or (self.__tid and not _thread.threadIsRunning(self.__tid)):
                     _thread.stack_size(0x2000)
                     self.__tid = _thread.start_new_thread(self._receive, ())
+                    self.__start_tick = utime.ticks_ms()
                     return True
             except Exception as e:
                 sys.print_exception(e)
@@ -435,6 +1533,8 @@ class GNSSBase(GNSSPower):
     def stop(self):
         """Stop gnss reading thread."""
         self.__running = 0 if self.__running == 1 else self.__running
+        self._wakeup()
+        self.save_state()
 
 
 class GNSSInternal(GNSSBase):
@@ -467,10 +1567,14 @@ class GNSSInternal(GNSSBase):
         log.debug("__internal_read start.")
         self.__running_end = 1
         self._open()
+        self._aid()
         while self.__running:
             gnss_data = quecgnss.read(1024)
-            self._parse_loc(gnss_data[1] if (isinstance(gnss_data, tuple) and gnss_data[1]) else b"")
-            utime.sleep(1)
+            gnss_data = gnss_data[1] if (isinstance(gnss_data, tuple) and gnss_data[1]) else b""
+            self._parse_loc(gnss_data)
+            # A full read means more data is waiting.
+            if len(gnss_data) < 1024 or self.get_rx_mode() == 0:
+                utime.sleep_ms(self._poll_interval())
         self._close()
         self.__tid = None
         self.__running_end = 0
@@ -484,25 +1588,48 @@ class GNSSExternalUART(GNSSBase):
         super().__init__(PowerPin, StandbyPin, BackupPin)
         self.__uart_args = (UARTn, buadrate, databits, parity, stopbits, flowctl)
         self.__gnss = None
+        self.__rx_sem = _thread.allocate_lock()
+        self.__rx_sem.acquire()
+
+    def __rx_cb(self, args):
+        """UART RX callback, wake up the receiving thread."""
+        self._wakeup()
+
+    def _wakeup(self):
+        if self.__rx_sem.locked():
+            self.__rx_sem.release()
 
     def _open(self):
         """Enable gnss power and init uart for reading gnss nmea data."""
         self.power(1)
         self.__gnss = UART(*self.__uart_args)
+        self.__gnss.set_callback(self.__rx_cb)
 
     def _close(self):
         """Close uart for stop reading gnss nmea data."""
         self.__gnss.close()
 
+    def _send(self, data):
+        if self.__gnss is None:
+            return False
+        if isinstance(data, str):
+            data = data.encode()
+        return self.__gnss.write(data) == len(data)
+
     def _receive(self):
         """Thread for reading and parsing gnss nmea data."""
         log.debug("GNSSExternalUART _receive start.")
         self.__running_end = 1
         self._open()
+        self._aid()
         while self.__running:
             size = self.__gnss.any()
             self._parse_loc(self.__gnss.read(size) if size > 0 else b"")
-            utime.sleep(1)
+            if self.get_rx_mode() == 0:
+                utime.sleep(1)
+            elif size <= 0:
+                # Wait for UART RX callback, data received meanwhile has already released it.
+                self.__rx_sem.acquire()
         self._close()
         self.__tid = None
         self.__running_end = 0
@@ -511,6 +1638,9 @@ class GNSSExternalUART(GNSSBase):
 
 class GNSSExternalI2C(GNSSBase):
 
+    # Size of one I2C read.
+    _RECV_SIZE = 1024
+
     def __init__(self, I2Cn, i2cmode, slaveaddress, addr, addr_len, PowerPin, StandbyPin, BackupPin):
         super().__init__(PowerPin, StandbyPin, BackupPin)
         self.__gnss = I2C(I2Cn, i2cmode)
@@ -518,34 +1648,58 @@ class GNSSExternalI2C(GNSSBase):
         self.addr = addr
         self.addr_len = addr_len
         self.source_data = b""
+        # A read goes to the buffer not kept as the latest nmea data of `read`, so that data stays valid.
+        self.__recv_bufs = (bytearray(self._RECV_SIZE), bytearray(self._RECV_SIZE))
+
+    def _send(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        return self.__gnss.write(self.slaveaddress, self.addr, self.addr_len, data, len(data)) == 0
 
     def _receive(self):
         log.debug("GNSSExternalI2C _receive start.")
         self.__running_end = 1
         self._open()
-        recv_size = 1024
-        nmea_data = bytearray([])
+        self._aid()
+        index = 0
         while self.__running:
-            recv_data = bytearray(recv_size)
-            self.__gnss.read(self.slaveaddress, self.addr, self.addr_len, recv_data, recv_size, 0)
-            nmea_data.extend(recv_data)
-            nmea_data = self._parse_loc(nmea_data)
-            utime.sleep_ms(500)
+            recv_buf = self.__recv_bufs[index]
+            self.__gnss.read(self.slaveaddress, self.addr, self.addr_len, recv_buf, self._RECV_SIZE, 0)
+            # Only a buffer kept as the latest nmea data is spared, a read of padding only is overwritten next.
+            if self._parse_loc(recv_buf):
+                index ^= 1
+            utime.sleep_ms(self._poll_interval() if self.get_rx_mode() else 500)
         self._close()
         self.__tid = None
         self.__running_end = 0
         log.debug("GNSSExternalI2C _receive stop.")
 
     def _parse_loc(self, data):
-        gps_data = bytearray([])
-        for i in data:
-            if i != 0x00:
-                gps_data.append(i)
-            else:
-                if gps_data:
-                    super()._parse_loc(bytes(gps_data))
-                    gps_data = bytearray([])
-        return gps_data
+        """Parse the nmea data of one I2C read.
+
+        The receiver pads the read with 0x00 when it has no more data. Runs of data between the paddings
+        are passed to the parser as memoryview slices of the receive buffer without copying, an unterminated
+        sentence at the end of the read is completed by the next read.
+
+        Args:
+            data (bytearray): receive buffer.
+
+        Returns:
+            bool: True - data was parsed and a view of the buffer is kept as the latest nmea data.
+        """
+        view = memoryview(data)
+        end = len(data)
+        start = 0
+        parsed = False
+        while 0 <= start < end:
+            pad = data.find(b"\x00", start)
+            stop = end if pad < 0 else pad
+            if stop > start:
+                super()._parse_loc(view[start:stop])
+                parsed = True
+            # Skip the padding, the next data starts a new sentence.
+            start = -1 if pad < 0 else data.find(b"$", pad)
+        return parsed
 
 
 class GNSS:
@@ -573,6 +1727,267 @@ class GNSS:
             raise ValueError("Args gps_mode is not compare.")
 
 
+class GNSSDutyCycle:
+    """This class is for GNSS power duty cycling by motion and fix quality.
+
+    The receiver is kept on until a fix meeting the HDOP limit arrives, then put into standby or backup
+    so that it wakes up early enough to have a new fix before the position is older than `max_age`.
+    Backup is used only when the device is not moving and the sleep is long enough to pay off its longer
+    re-acquire time, the expected re-acquire time of each state is measured after every wake.
+
+    Standby and backup are set by the `GNSSPower` pins, without a pin the gnss reading is stopped instead.
+    """
+
+    CONTINUOUS = 0
+    STANDBY = 1
+    BACKUP = 2
+
+    _STATE_NAMES = ("continuous", "standby", "backup")
+    # Re-acquire time samples kept.
+    _SAMPLES = 16
+
+    def __init__(self, gnss, max_age=60, hdop=2.0, moving_speed=5.0, acquire_timeout=120, min_sleep=10, backup_sleep=300):
+        """
+        Args:
+            gnss (GNSSBase): gnss object.
+            max_age (int): max position age (s).
+            hdop (float): max HDOP of a fix ending the acquisition. (default: 2.0)
+            moving_speed (float): speed from which the device is moving (km/h), backup is not used when moving. (default: 5.0)
+            acquire_timeout (int): time to wait for a fix after waking up before sleeping again (s). (default: 120)
+            min_sleep (int): min standby time (s). (default: 10)
+            backup_sleep (int): min backup time (s). (default: 300)
+        """
+        self.__gnss = gnss
+        self.__max_age = max_age * 1000
+        self.__hdop = hdop
+        self.__moving_speed = moving_speed
+        self.__acquire_timeout = acquire_timeout * 1000
+        self.__min_sleep = {self.STANDBY: min_sleep * 1000, self.BACKUP: backup_sleep * 1000}
+        # Expected re-acquire time (ms), hot start for standby, warm start for backup until measured.
+        self.__reacquire = {self.STANDBY: 5000, self.BACKUP: 30000}
+        self.__lock = _thread.allocate_lock()
+        self.__running = 0
+        self.__sid = None
+        self.__state = self.CONTINUOUS
+        self.__state_tick = utime.ticks_ms()
+        self.__state_ms = [0, 0, 0]
+        self.__stopped = False
+        self.__fix = None
+        self.__fix_tick = None
+        self.__wake_tick = None
+        self.__wake_from = self.CONTINUOUS
+        self.__wake_at = None
+        self.__wakes = 0
+        self.__timeouts = 0
+        self.__samples = array("i", bytes(4 * self._SAMPLES))
+        self.__sample_count = 0
+
+    def __on_fix(self, fix):
+        now = utime.ticks_ms()
+        with self.__lock:
+            self.__fix = fix
+            self.__fix_tick = now
+            if self.__wake_tick is None:
+                return
+            if self.__wake_from != self.CONTINUOUS:
+                used = utime.ticks_diff(now, self.__wake_tick)
+                self.__samples[self.__sample_count % self._SAMPLES] = used
+                self.__sample_count += 1
+                est = self.__reacquire[self.__wake_from]
+                self.__reacquire[self.__wake_from] = (est * 3 + used) // 4
+            self.__wake_tick = None
+
+    def __enter(self, state, now):
+        """Move the receiver to a state and account the time of the previous state."""
+        self.__state_ms[self.__state] += utime.ticks_diff(now, self.__state_tick)
+        self.__state_tick = now
+        gnss = self.__gnss
+        if state == self.CONTINUOUS:
+            gnss.standby(0)
+            gnss.backup(0)
+            if self.__stopped:
+                self.__stopped = False
+                gnss.start()
+            self.__wake_tick = now
+            self.__wake_from = self.__state
+            self.__wakes += 1
+        elif not (gnss.standby(1) if state == self.STANDBY else gnss.backup(1)):
+            self.__stopped = True
+            gnss.stop()
+        self.__state = state
+
+    def __plan(self, now):
+        """Choose the sleep state and its wake up time after a good fix.
+
+        Returns:
+            tuple: (state, wake up ticks), None if the receiver should stay on.
+        """
+        age = utime.ticks_diff(now, self.__fix_tick)
+        states = (self.STANDBY,) if self.__fix.speed >= self.__moving_speed else (self.BACKUP, self.STANDBY)
+        for state in states:
+            sleep = self.__max_age - age - self.__reacquire[state]
+            if sleep >= self.__min_sleep[state]:
+                return state, utime.ticks_add(now, sleep)
+        return None
+
+    def __step(self):
+        now = utime.ticks_ms()
+        with self.__lock:
+            if self.__state != self.CONTINUOUS:
+                if utime.ticks_diff(now, self.__wake_at) >= 0:
+                    self.__enter(self.CONTINUOUS, now)
+                return
+            if self.__wake_tick is not None:
+                if utime.ticks_diff(now, self.__wake_tick) < self.__acquire_timeout:
+                    return
+                # No fix, sleep for a position age period anyway instead of draining the battery.
+                self.__timeouts += 1
+                moving = self.__fix is not None and self.__fix.speed >= self.__moving_speed
+                self.__wake_at = utime.ticks_add(now, self.__max_age)
+                self.__enter(self.STANDBY if moving else self.BACKUP, now)
+                return
+            if self.__fix_tick is None:
+                return
+            plan = self.__plan(now)
+            if plan is not None:
+                self.__wake_at = plan[1]
+                self.__enter(plan[0], now)
+
+    def __run(self):
+        while self.__running:
+            try:
+                self.__step()
+            except Exception as e:
+                sys.print_exception(e)
+            utime.sleep(1)
+
+    def start(self):
+        """Start duty cycling, the receiver is on until the first fix.
+
+        Returns:
+            bool: True - success, False - failed.
+        """
+        if self.__running:
+            return False
+        with self.__lock:
+            self.__sid = self.__gnss.subscribe(self.__on_fix, hdop=self.__hdop)
+            self.__gnss.start()
+            self.__state_tick = utime.ticks_ms()
+            self.__wake_tick = self.__state_tick
+            self.__wake_from = self.CONTINUOUS
+        self.__running = 1
+        try:
+            _thread.stack_size(0x2000)
+            _thread.start_new_thread(self.__run, ())
+            return True
+        except Exception as e:
+            sys.print_exception(e)
+            self.stop()
+            return False
+
+    def stop(self):
+        """Stop duty cycling and keep the receiver on."""
+        self.__running = 0
+        with self.__lock:
+            if self.__sid is not None:
+                self.__gnss.unsubscribe(self.__sid)
+                self.__sid = None
+            if self.__state != self.CONTINUOUS:
+                self.__enter(self.CONTINUOUS, utime.ticks_ms())
+            self.__wake_tick = None
+
+    def state(self):
+        """Get receiver state.
+
+        Returns:
+            int: CONTINUOUS / STANDBY / BACKUP.
+        """
+        return self.__state
+
+    def stats(self):
+        """Get time spent in each state and re-acquire times.
+
+        Returns:
+            dict: {
+                "state": str,
+                "time": {"continuous": int(s), "standby": int(s), "backup": int(s)},
+                "wakes": int,
+                "timeouts": int, wakes without a fix in `acquire_timeout`,
+                "reacquire": [int(ms), ...] latest samples, oldest first,
+                "reacquire_estimate": {"standby": int(ms), "backup": int(ms)},
+            }
+        """
+        with self.__lock:
+            times = list(self.__state_ms)
+            times[self.__state] += utime.ticks_diff(utime.ticks_ms(), self.__state_tick)
+            count = min(self.__sample_count, self._SAMPLES)
+            start = self.__sample_count - count
+            return {
+                "state": self._STATE_NAMES[self.__state],
+                "time": dict((self._STATE_NAMES[i], times[i] // 1000) for i in range(3)),
+                "wakes": self.__wakes,
+                "timeouts": self.__timeouts,
+                "reacquire": [self.__samples[(start + i) % self._SAMPLES] for i in range(count)],
+                "reacquire_estimate": {
+                    "standby": self.__reacquire[self.STANDBY],
+                    "backup": self.__reacquire[self.BACKUP],
+                },
+            }
+
+
+class NMEARecorder:
+    """This class is for recording raw gnss nmea data with receive time.
+
+    It can be used as the `set_trans` output or be called with the `read(mode=2)` data. Each record is a
+    header line of receive time and data length, `"<ticks_ms> <length>\\n"`, followed by the raw data.
+    The file can be replayed on a host by `tools/nmea_replay.py`.
+
+    Usage:
+        recorder = NMEARecorder("/usr/gnss.nmea")
+        gnss.set_trans(1, recorder)
+    """
+
+    def __init__(self, path, max_size=0x40000):
+        """
+        Args:
+            path (str): record file path, data is appended.
+            max_size (int): stop recording when the file reaches this size (byte), 0 - no limit. (default: 256KB)
+        """
+        self.__path = path
+        self.__max_size = max_size
+        self.__file = None
+        self.__size = 0
+
+    def __call__(self, data):
+        if not data:
+            return
+        if isinstance(data, str):
+            data = data.encode()
+        try:
+            if self.__file is None:
+                self.__file = open(self.__path, "ab")
+                self.__size = self.__file.seek(0, 2)
+            if self.__max_size and self.__size + len(data) > self.__max_size:
+                return
+            header = ("%d %d\n" % (utime.ticks_ms(), len(data))).encode()
+            self.__file.write(header)
+            self.__file.write(data)
+            self.__file.flush()
+            self.__size += len(header) + len(data)
+        except Exception as e:
+            sys.print_exception(e)
+
+    def size(self):
+        """Get recorded file size (byte)."""
+        return self.__size
+
+    def close(self):
+        """Close record file."""
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
 class CellLocator:
     """This class is for reading cell location data"""
 
@@ -601,3 +2016,181 @@ class WiFiLocator:
         except Exception as e:
             sys.print_exception(e)
         return loc_data
+
+
+class LocationManager:
+    """This class is for reading location from GNSS, Wi-Fi and cell locators in parallel.
+
+    Wi-Fi and cell lookups run in their own threads while GNSS is waited for a new fix, each with its own
+    deadline, and the result with the best accuracy is returned. Reading stops early when a result is better
+    than what the providers still running usually deliver.
+
+    Wi-Fi and cell results are cached for `cache_ttl` seconds, keyed by the visible access points and by the
+    serving cell, so a device that has not moved does not repeat the network lookup.
+    """
+
+    # Usual accuracy of each provider (m), for stopping early.
+    _EXPECTED_ACCURACY = {"gnss": 10, "wifi": 50, "cell": 500}
+    # Accuracy of a GNSS fix per HDOP (m).
+    _GNSS_UERE = 5
+    # Cache entries kept per provider.
+    _CACHE_SIZE = 8
+
+    def __init__(self, gnss=None, wifi=None, cell=None, cache_ttl=600, gnss_timeout=60, wifi_timeout=15, cell_timeout=15):
+        """
+        Args:
+            gnss (GNSSBase): gnss object, started by the manager when reading. (default: None, not used)
+            wifi (WiFiLocator): wifi locator object. (default: None, not used)
+            cell (CellLocator): cell locator object. (default: None, not used)
+            cache_ttl (int): wifi and cell result cache time (s), 0 - disable cache. (default: 600)
+            gnss_timeout (int): deadline of waiting for a new gnss fix (s). (default: 60)
+            wifi_timeout (int): deadline of wifi location (s). (default: 15)
+            cell_timeout (int): deadline of cell location (s). (default: 15)
+        """
+        self.__gnss = gnss
+        self.__locators = {"wifi": wifi, "cell": cell}
+        self.__cache_ttl = cache_ttl * 1000
+        self.__timeouts = {"gnss": gnss_timeout * 1000, "wifi": wifi_timeout * 1000, "cell": cell_timeout * 1000}
+        self.__lock = _thread.allocate_lock()
+        self.__busy = {"wifi": False, "cell": False}
+        self.__results = {}
+        self.__result_seq = 0
+        self.__cache = {"wifi": [], "cell": []}
+
+    def __cell_key(self):
+        """Get serving cell (lac, ci), None if unknown."""
+        if net is None:
+            return None
+        try:
+            lac, ci = net.getServingLac(), net.getServingCi()
+        except Exception as e:
+            sys.print_exception(e)
+            return None
+        return (lac, ci) if isinstance(lac, int) and isinstance(ci, int) and lac >= 0 and ci >= 0 else None
+
+    def __wifi_key(self):
+        """Get BSSID set of the visible access points, None if unknown."""
+        if wifiScan is None:
+            return None
+        try:
+            if not wifiScan.getState():
+                wifiScan.control(1)
+            res = wifiScan.start()
+        except Exception as e:
+            sys.print_exception(e)
+            return None
+        return set(ap[0] for ap in res[1]) if isinstance(res, tuple) and res[0] > 0 else None
+
+    def __cache_get(self, name, key):
+        now = utime.ticks_ms()
+        with self.__lock:
+            for entry in self.__cache[name]:
+                if utime.ticks_diff(now, entry[1]) >= self.__cache_ttl:
+                    continue
+                if entry[0] == key or (
+                    name == "wifi" and len(entry[0] & key) * 2 >= max(len(entry[0]), len(key))
+                ):
+                    return entry[2]
+        return None
+
+    def __cache_put(self, name, key, result):
+        with self.__lock:
+            entries = [e for e in self.__cache[name] if e[0] != key]
+            entries.append((key, utime.ticks_ms(), result))
+            self.__cache[name] = entries[-self._CACHE_SIZE:]
+
+    def __lookup(self, name):
+        """Thread for one wifi or cell lookup, checking the cache first."""
+        result = None
+        try:
+            key = None
+            if self.__cache_ttl > 0:
+                key = self.__wifi_key() if name == "wifi" else self.__cell_key()
+            if key:
+                result = self.__cache_get(name, key)
+                if result is not None:
+                    result = dict(result, cached=True)
+            if result is None:
+                res = self.__locators[name].read()
+                if isinstance(res, tuple) and len(res) >= 3 and (res[0] or res[1]):
+                    result = {"source": name, "lng": res[0], "lat": res[1], "accuracy": res[2], "cached": False}
+                    if key:
+                        self.__cache_put(name, key, result)
+                else:
+                    log.debug("%s locator failed: %s", name, res)
+        except Exception as e:
+            sys.print_exception(e)
+        with self.__lock:
+            self.__result_seq += 1
+            self.__results[name] = (self.__result_seq, result)
+            self.__busy[name] = False
+
+    def __gnss_result(self, fix):
+        accuracy = fix.hdop * self._GNSS_UERE if fix.hdop > 0 else self._EXPECTED_ACCURACY["gnss"]
+        return {"source": "gnss", "lng": fix.lng, "lat": fix.lat, "accuracy": accuracy, "cached": False}
+
+    def read(self):
+        """Read location from all configured providers.
+
+        Returns:
+            dict: best location, None if all providers failed.
+                {"source": "gnss"/"wifi"/"cell", "lng": float, "lat": float, "accuracy": float(m), "cached": bool}
+        """
+        start = utime.ticks_ms()
+        with self.__lock:
+            start_seq = self.__result_seq
+        providers = []
+        gnss_fix = None
+        if self.__gnss is not None:
+            gnss_fix = self.__gnss.last_fix()
+            self.__gnss.start()
+            providers.append("gnss")
+        for name in ("wifi", "cell"):
+            if self.__locators[name] is None:
+                continue
+            providers.append(name)
+            with self.__lock:
+                if self.__busy[name]:
+                    # A lookup of an earlier read is still running, use its result.
+                    continue
+                self.__busy[name] = True
+            try:
+                _thread.stack_size(0x2000)
+                _thread.start_new_thread(self.__lookup, (name,))
+            except Exception as e:
+                sys.print_exception(e)
+                with self.__lock:
+                    self.__busy[name] = False
+
+        best = None
+        done = set()
+        while True:
+            now = utime.ticks_ms()
+            if "gnss" in providers and "gnss" not in done:
+                fix = self.__gnss.last_fix()
+                if fix is not None and fix is not gnss_fix:
+                    done.add("gnss")
+                    result = self.__gnss_result(fix)
+                    if best is None or result["accuracy"] < best["accuracy"]:
+                        best = result
+            with self.__lock:
+                for name, (seq, result) in self.__results.items():
+                    if name in providers and name not in done and seq > start_seq:
+                        done.add(name)
+                        if result is not None and (best is None or result["accuracy"] < best["accuracy"]):
+                            best = result
+            pending = [
+                name for name in providers
+                if name not in done and utime.ticks_diff(now, start) < self.__timeouts[name]
+            ]
+            if not pending:
+                break
+            if best is not None and best["accuracy"] <= min(self._EXPECTED_ACCURACY[name] for name in pending):
+                break
+            utime.sleep_ms(100)
+        return best
+
+    def clear_cache(self):
+        """Clear wifi and cell result cache."""
+        with self.__lock:
+            self.__cache = {"wifi": [], "cell": []}
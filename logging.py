@@ -28,12 +28,27 @@ import uos
 import sys
 import utime
 import ql_fs
+import ujson
+import ustruct
 import _thread
+import ubinascii
+
+try:
+    import osTimer
+except ImportError:
+    osTimer = None
+
+try:
+    import uio
+    import deflate
+except ImportError:
+    deflate = None
 
 __all__ = [
     "CRITICAL", "FATAL", "ERROR", "WARNING", "WARN", "INFO", "DEBUG", "NOTSET",
-    "Logger", "getLogger", "setSaveLog", "getSaveLog", "setLogLevel",
-    "getLogLevel", "setLogDebug", "getLogDebug",
+    "Logger", "FileHandler", "LogShipper", "getLogger", "setSaveLog", "getSaveLog", "readLog", "flushLog",
+    "setLogLevel", "getLogLevel", "setLogDebug", "getLogDebug", "setLogAsync", "getLogAsync", "getLogDrops",
+    "setCrashLog", "dumpCrashLog", "setLogSuppress", "getLogSuppressed", "addLogHandler", "removeLogHandler",
 ]
 
 _LOG_LOCK = _thread.allocate_lock()
@@ -76,82 +91,886 @@ _LOG_SIZE = 0x8000
 _LOG_BACK = 8
 _LOG_LEVEL = DEBUG
 _LOG_DEBUG = True
+_LOG_BUFFER = 0x1000
+_LOG_PERIOD = 5
+_LOG_BINARY = False
+_LOG_HANDLER = None
+_LOG_ASYNC = None
+_LOG_RING = None
+_LOG_REPEAT = 0
+_LOG_RATE = 0
+_LOG_BURST = 10
+_LOG_RATE_LEVEL = INFO
+_LOG_LAST = {}
+_LOG_BUCKETS = {}
+_LOG_SUPPRESSED = {}
+_LOG_HANDLERS = []
 
+_print_exception = sys.print_exception
 
-class Logger:
-    def __init__(self, name):
-        self.__name = name
+
+def _varint(buf, value):
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n") if "\\" in text or "\n" in text else text
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        if text[i] == "\\" and i + 1 < len(text):
+            out.append("\n" if text[i + 1] == "n" else text[i + 1])
+            i += 2
+        else:
+            out.append(text[i])
+            i += 1
+    return "".join(out)
+
+
+class _BinaryEncoder:
+    """This class is the binary log record encoder.
+
+    Format strings and logger names are interned in a dictionary file next to the log file, one line per
+    entry, `t <template>` or `n <name>`, the id is the line order per kind. The first line is
+    `e <localtime(0)>` so the decoder can map device seconds to a date.
+
+    A record is:
+
+        head      1 byte, bit 0-2 level // 10, bit 3 absolute time, bit 4-7 argument count
+        time      varint, seconds since the previous record, or absolute seconds if bit 3 is set
+        logger    varint, name id
+        template  varint, template id
+        args      per argument a tag byte and the value:
+                  0 None, 1 int (zigzag varint), 2 float (8 byte little endian), 3 str (varint length, utf-8),
+                  4 bytes (varint length, raw), 5 True, 6 False
+
+    Only the format strings of printf-style messages are interned, they are constants in the code. Other
+    messages are stored with the template `%s %s ...` and the first argument inline, so text built at run time
+    does not grow the dictionary. Once `_TEMPLATES_MAX` templates are interned, the formatted text of a new
+    format string is stored inline as well. The decoder always formats `template % args` with the `_format` fallback.
+    """
+
+    _TEMPLATES_MAX = 256
+
+    def __init__(self, path):
+        self.__path = path
+        self.__ids = ({}, {})
+        self.__last = None
+        if ql_fs.path_exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    if line[:2] in ("t ", "n "):
+                        ids = self.__ids[line[0] == "n"]
+                        ids[_unescape(line[2:].rstrip("\n"))] = len(ids)
+        else:
+            with open(path, "w") as f:
+                f.write("e {} {} {} {} {} {}\n".format(*utime.localtime(0)[:6]))
+
+    def __intern(self, kind, text):
+        ids = self.__ids[kind == "n"]
+        _id = ids.get(text)
+        if _id is None:
+            _id = len(ids)
+            with open(self.__path, "a") as f:
+                f.write(kind + " " + _escape(text) + "\n")
+            ids[text] = _id
+        return _id
+
+    def reset(self):
+        """Store the time of the next record as absolute, e.g. at the start of a new file."""
+        self.__last = None
+
+    def encode(self, timestamp, name, level, message):
+        """Encode a log record.
+
+        Args:
+            timestamp (int): `utime.time()` of the record, None - now.
+            name (str): logger name.
+            level (int): log level.
+            message (tuple): log call arguments.
+
+        Returns:
+            bytearray: encoded record.
+        """
+        templates = self.__ids[0]
+        printf = len(message) > 1 and isinstance(message[0], str) and "%" in message[0]
+        if printf and len(message) <= 16 and (message[0] in templates or len(templates) < self._TEMPLATES_MAX):
+            template, args = message[0], message[1:]
+        else:
+            args = message if len(message) <= 15 and not printf else (_format(message),)
+            template = " ".join(("%s",) * len(args))
+        timestamp = utime.time() if timestamp is None else timestamp
+        buf = bytearray()
+        head = (level // 10) | (len(args) << 4)
+        if self.__last is None or timestamp < self.__last:
+            buf.append(head | 0x08)
+            _varint(buf, timestamp)
+        else:
+            buf.append(head)
+            _varint(buf, timestamp - self.__last)
+        self.__last = timestamp
+        _varint(buf, self.__intern("n", name))
+        _varint(buf, self.__intern("t", template))
+        for arg in args:
+            if arg is None:
+                buf.append(0)
+            elif arg is True:
+                buf.append(5)
+            elif arg is False:
+                buf.append(6)
+            elif isinstance(arg, int):
+                buf.append(1)
+                _varint(buf, arg << 1 if arg >= 0 else ((-arg) << 1) - 1)
+            elif isinstance(arg, float):
+                buf.append(2)
+                buf.extend(ustruct.pack("<d", arg))
+            elif isinstance(arg, (bytes, bytearray)):
+                buf.append(4)
+                _varint(buf, len(arg))
+                buf.extend(arg)
+            else:
+                data = (arg if isinstance(arg, str) else str(arg)).encode()
+                buf.append(3)
+                _varint(buf, len(data))
+                buf.extend(data)
+        return buf
+
+
+class FileHandler:
+    """This class is buffered log file output with size based rotation.
+
+    Lines are collected in a fixed bytearray and written in one write when the buffer is full, when the flush
+    timer expires or at once for ERROR and above. The file size is tracked in memory, the file system is only
+    asked for it when the file is opened.
+
+    Logs are written to a ring of `backups + 1` segment files `<name>.0` ... `<name>.<backups>`, the manifest
+    `<name>.idx` keeps the index of the segment being written. A rollover truncates the next segment and
+    rewrites the manifest, which is kept open, so only one file is opened and no file is renamed. Segments are
+    rotated between records, so every segment starts with a whole record. Log files of the former rename
+    based rotation, `<name>` and `<name>.1` ..., are deleted on the first start without a manifest.
+
+    In binary mode records are written by `_BinaryEncoder` instead of as text lines, the dictionary file is
+    `<name>.dict` and `tools/logdecode.py` converts the files back to text on the host.
+    """
+
+    def __init__(self, path, name, size, backups, buffer_size=0x1000, period=5, binary=False):
+        """
+        Args:
+            path (str): log directory, ends with `/`.
+            name (str): log file name.
+            size (int): max size of one log file (byte).
+            backups (int): full segments kept besides the one being written.
+            buffer_size (int): write buffer size (byte). (default: 4KB)
+            period (int): flush period (s), 0 - no timer. (default: 5)
+            binary (bool): True - binary records, False - text lines. (default: False)
+        """
+        self.__path = path
+        self.__file_name = path + name
+        self.__max_size = size
+        self.__backups = backups
+        self.__buf = bytearray(buffer_size)
+        self.__buf_len = 0
         self.__file = None
+        self.__size = 0
+        self.__index = None
+        self.__manifest = None
+        self.__encoder = None
+        self.__lock = _thread.allocate_lock()
+        self.__timer = None
+        if binary:
+            self.__open()
+            self.__encoder = _BinaryEncoder(self.__file_name + ".dict")
+        if osTimer is not None and period > 0:
+            self.__timer = osTimer()
+            self.__timer.start(period * 1000, 1, self.__on_timer)
+
+    @property
+    def binary(self):
+        return self.__encoder is not None
+
+    def __on_timer(self, args):
+        self.flush()
+
+    def __segment(self, index):
+        return self.__file_name + "." + str(index)
+
+    def __load_index(self):
+        if self.__index is None:
+            self.__index = 0
+            try:
+                with open(self.__file_name + ".idx", "r") as f:
+                    index = int(f.read())
+                if 0 <= index <= self.__backups:
+                    self.__index = index
+            except OSError:
+                self.__remove_old()
+            except ValueError:
+                pass
+        return self.__index
 
-    def __open_log(self):
-        global _LOG_FILE
-        if not self.__file:
-            self.__file = open(_LOG_FILE, "wb")
+    def __remove_old(self):
+        if not ql_fs.path_exists(self.__file_name):
+            return
+        uos.remove(self.__file_name)
+        index = 1
+        while ql_fs.path_exists(self.__segment(index)):
+            uos.remove(self.__segment(index))
+            index += 1
 
-    def __close_log(self):
-        if self.__file:
+    def __open(self, mode="ab"):
+        if self.__file is None:
+            if not ql_fs.path_exists(self.__path):
+                uos.mkdir(self.__path[:-1])
+            segment = self.__segment(self.__load_index())
+            self.__size = ql_fs.path_getsize(segment) if mode == "ab" and ql_fs.path_exists(segment) else 0
+            self.__file = open(segment, mode)
+
+    def __close(self):
+        if self.__file is not None:
             self.__file.close()
             self.__file = None
 
-    def __write_log(self, msg):
-        if self.__file:
-            self.__file.write(msg)
-            self.__file.flush()
+    def __rotate(self):
+        self.__close()
+        self.__index = (self.__load_index() + 1) % (self.__backups + 1)
+        self.__open("wb")
+        # Fixed width, so the manifest is rewritten in place.
+        if self.__manifest is None:
+            self.__manifest = open(self.__file_name + ".idx", "wb")
+        self.__manifest.seek(0)
+        self.__manifest.write((("%0" + str(len(str(self.__backups))) + "d") % self.__index).encode())
+        self.__manifest.flush()
+
+    def __write(self, data):
+        self.__open()
+        self.__file.write(data)
+        self.__file.flush()
+        self.__size += len(data)
+
+    def __flush(self):
+        if self.__buf_len:
+            size, self.__buf_len = self.__buf_len, 0
+            self.__write(memoryview(self.__buf)[:size])
+
+    def write(self, msg, level=NOTSET, record=None):
+        """Add a log line.
+
+        Args:
+            msg (str): log line without line end.
+            level (int): log level, ERROR and above are flushed at once. (default: NOTSET)
+            record (tuple): (timestamp, name, level, message) of the line, encoded instead of `msg` in binary mode.
+                            (default: None)
+        """
+        with self.__lock:
+            try:
+                if self.__encoder is not None and record is not None:
+                    data = self.__encoder.encode(*record)
+                else:
+                    data = (msg + "\n").encode()
+                self.__open()
+                used = self.__size + self.__buf_len
+                if used and used + len(data) >= self.__max_size:
+                    self.__flush()
+                    self.__rotate()
+                    if self.__encoder is not None and record is not None:
+                        self.__encoder.reset()
+                        data = self.__encoder.encode(*record)
+                if self.__buf_len + len(data) > len(self.__buf):
+                    self.__flush()
+                if len(data) > len(self.__buf):
+                    self.__write(data)
+                else:
+                    self.__buf[self.__buf_len:self.__buf_len + len(data)] = data
+                    self.__buf_len += len(data)
+                if level >= ERROR:
+                    self.__flush()
+            except Exception as e:
+                self.__buf_len = 0
+                sys.print_exception(e)
+
+    def flush(self):
+        """Write buffered lines to the log file."""
+        with self.__lock:
+            try:
+                self.__flush()
+            except Exception as e:
+                sys.print_exception(e)
+
+    def segments(self):
+        """Get the existing segment files, oldest first.
+
+        Returns:
+            list: segment file paths.
+        """
+        with self.__lock:
+            index = self.__load_index()
+        count = self.__backups + 1
+        paths = [self.__segment((index + i) % count) for i in range(1, count + 1)]
+        return [path for path in paths if ql_fs.path_exists(path)]
+
+    def lines(self):
+        """Iterate the saved log lines in order across segments, buffered lines are flushed first.
+
+        Yields:
+            str: log line without line end.
+        """
+        self.flush()
+        for path in self.segments():
+            with open(path, "r") as f:
+                while True:
+                    line = f.readline()
+                    if not line:
+                        break
+                    yield line.rstrip("\n")
+
+    def close(self):
+        """Flush, stop the flush timer and close the log file."""
+        if self.__timer is not None:
+            self.__timer.stop()
+            self.__timer = None
+        self.flush()
+        with self.__lock:
+            self.__close()
+            if self.__manifest is not None:
+                self.__manifest.close()
+                self.__manifest = None
 
-    def __save_log(self, msg):
+
+class LogShipper:
+    """This class is a log handler shipping batches of log lines to the cloud.
+
+    WARNING and above lines are always collected, lower levels by the `sample` share. A batch is published
+    from the shipper thread when it reaches `max_size` bytes or every `period` seconds, never in the logging
+    call, as `{"log": text, "z": 0, "n": lines}`, or with `z` 1 and `log` the base64 of the zlib stream when
+    the firmware has the `deflate` module. Batches that can not be published while offline are appended to
+    the spool file and published first when the client is back.
+    """
+
+    def __init__(self, client, level=WARNING, sample=0, max_size=2048, period=60, spool=None, spool_size=0x4000,
+                 event="log"):
+        """
+        Args:
+            client: `thingsboard.TBDeviceMQTTClient` (`send_telemetry`), `aliIot.AliIot` (`event_report` of
+                    `event`) or a callable `publish(payload) -> bool`.
+            level (int): lowest level always shipped. (default: WARNING)
+            sample (float): share of lower level lines shipped, 0 - 1. (default: 0)
+            max_size (int): batch size to publish at once (byte). (default: 2048)
+            period (int): max time a line waits to be published (s). (default: 60)
+            spool (str): spool file of unpublished batches, None - drop them. (default: None)
+            spool_size (int): max spool file size (byte). (default: 16KB)
+            event (str): AliIot event identifier. (default: "log")
+        """
+        if callable(client):
+            self.__publish = client
+        elif hasattr(client, "send_telemetry"):
+            self.__publish = client.send_telemetry
+        else:
+            self.__publish = lambda payload: client.event_report(event, payload)
+        # `status` is a property of TBDeviceMQTTClient and AliIot, read it on every send.
+        self.__client = None if callable(client) else client
+        self.__level = level
+        self.__sample = sample
+        self.__acc = 0
+        self.__max_size = max_size
+        self.__period = period
+        self.__spool = spool
+        self.__spool_size = spool_size
+        self.__lines = []
+        self.__size = 0
+        self.__due = 0
+        self.__last = utime.ticks_ms()
+        self.__stats = {"batches": 0, "lines": 0, "spooled": 0, "dropped": 0}
+        self.__lock = _thread.allocate_lock()
+        self.__ship_lock = _thread.allocate_lock()
+        self.__running = 0
+
+    def write(self, msg, level=NOTSET, record=None):
+        """Collect a log line, called by the log output.
+
+        Args:
+            msg (str): log line.
+            level (int): log level. (default: NOTSET)
+            record (tuple): unused. (default: None)
+        """
+        if level < self.__level:
+            self.__acc += self.__sample
+            if self.__acc < 1:
+                return
+            self.__acc -= 1
+        with self.__lock:
+            if self.__size > self.__max_size * 4:
+                self.__stats["dropped"] += 1
+                return
+            self.__lines.append(msg)
+            self.__size += len(msg) + 1
+            if self.__size >= self.__max_size:
+                self.__due = 1
+
+    def __payload(self, lines):
+        text = "\n".join(lines)
+        if deflate is None:
+            return {"log": text, "z": 0, "n": len(lines)}
+        stream = uio.BytesIO()
+        with deflate.DeflateIO(stream, deflate.ZLIB) as f:
+            f.write(text.encode())
+        return {"log": ubinascii.b2a_base64(stream.getvalue()).decode().strip(), "z": 1, "n": len(lines)}
+
+    def __send(self, payload):
+        try:
+            status = getattr(self.__client, "status", None)
+            if callable(status):
+                status = status()
+            if status is not None and not status:
+                return False
+            return self.__publish(payload) is True
+        except Exception as e:
+            sys.print_exception(e)
+            return False
+
+    def __spool_write(self, payloads):
+        data = "".join(ujson.dumps(payload) + "\n" for payload in payloads)
+        size = ql_fs.path_getsize(self.__spool) if ql_fs.path_exists(self.__spool) else 0
+        if size + len(data) > self.__spool_size:
+            return False
+        with open(self.__spool, "a") as f:
+            f.write(data)
+        return True
+
+    def __spool_send(self):
+        """Publish spooled batches oldest first, returns False if one failed."""
+        if self.__spool is None or not ql_fs.path_exists(self.__spool):
+            return True
+        with open(self.__spool, "r") as f:
+            payloads = [ujson.loads(line) for line in f.read().split("\n") if line]
+        uos.remove(self.__spool)
+        for i, payload in enumerate(payloads):
+            if not self.__send(payload):
+                self.__spool_write(payloads[i:])
+                return False
+            self.__stats["batches"] += 1
+        return True
+
+    def ship(self):
+        """Publish the collected lines now, spooled batches first.
+
+        Returns:
+            bool: True - published, False - spooled or dropped.
+        """
+        with self.__ship_lock:
+            with self.__lock:
+                lines, self.__lines, self.__size, self.__due = self.__lines, [], 0, 0
+                self.__last = utime.ticks_ms()
+            try:
+                sent = self.__spool_send()
+                if not lines:
+                    return sent
+                payload = self.__payload(lines)
+                if sent and self.__send(payload):
+                    self.__stats["batches"] += 1
+                    self.__stats["lines"] += len(lines)
+                    return True
+                if self.__spool is not None and self.__spool_write((payload,)):
+                    self.__stats["spooled"] += len(lines)
+                else:
+                    self.__stats["dropped"] += len(lines)
+            except Exception as e:
+                sys.print_exception(e)
+            return False
+
+    def __run(self):
+        while self.__running:
+            utime.sleep(1)
+            if self.__due or (self.__lines and utime.ticks_diff(utime.ticks_ms(), self.__last) >= self.__period * 1000):
+                self.ship()
+
+    def start(self):
+        """Add the shipper to the log output and start the shipper thread.
+
+        Returns:
+            bool: True - success, False - failed.
+        """
+        if self.__running:
+            return False
+        self.__running = 1
         try:
-            msg += "\n" if not msg.endswith("\n") else ""
-            log_size = 0
-            if not ql_fs.path_exists(_LOG_PATH):
-                uos.mkdir(_LOG_PATH[:-1])
-            if ql_fs.path_exists(_LOG_FILE):
-                log_size = ql_fs.path_getsize(_LOG_FILE)
-                if log_size + len(msg) >= _LOG_SIZE:
-                    self.__close_log()
-                    for i in range(_LOG_BACK, 0, -1):
-                        bak_file = _LOG_FILE + "." + str(i)
-                        if ql_fs.path_exists(bak_file):
-                            if i == _LOG_BACK:
-                                uos.remove(bak_file)
-                            else:
-                                uos.rename(bak_file, _LOG_FILE + "." + str(i + 1))
-                    uos.rename(_LOG_FILE, _LOG_FILE + ".1")
-            self.__open_log()
-            self.__write_log(msg)
+            _thread.stack_size(0x2000)
+            _thread.start_new_thread(self.__run, ())
         except Exception as e:
             sys.print_exception(e)
+            self.__running = 0
+            return False
+        return addLogHandler(self)
+
+    def stop(self):
+        """Remove the shipper from the log output, stop the thread and publish the collected lines."""
+        self.__running = 0
+        removeLogHandler(self)
+        self.ship()
+
+    def stats(self):
+        """Get shipping counters.
+
+        Returns:
+            dict: {"batches": published batches, "lines": published lines, "spooled": lines spooled,
+                   "dropped": lines dropped}
+        """
+        return dict(self.__stats)
+
+
+def _enabled(level):
+    return not (_LOG_DEBUG is False and ((_LOG_LEVEL == level == DEBUG) or level < _LOG_LEVEL))
+
+
+def _format(message):
+    """Format log message arguments.
+
+    A first argument with `%` is formatted printf-style with the other arguments, e.g. `("topic: %s", topic)`,
+    otherwise or if that fails the arguments are joined by spaces.
+    """
+    if len(message) > 1 and isinstance(message[0], str) and "%" in message[0]:
+        try:
+            return message[0] % message[1:]
+        except (TypeError, ValueError):
+            pass
+    return " ".join(m if isinstance(m, str) else str(m) for m in message)
+
+
+def _strtime(timestamp=None):
+    return "{}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}".format(
+        *(utime.localtime() if timestamp is None else utime.localtime(timestamp))
+    )
+
+
+def _line(timestamp, name, level, message):
+    """Format a log record as a text line."""
+    msg = "[{}][{}][{}]".format(_strtime(timestamp), name, _levelToName[level])
+    if message:
+        msg = msg + " " + _format(message)
+    return msg
+
+
+def _output(timestamp, name, level, message):
+    """Format a log record and output it to console and log file."""
+    msg = _line(timestamp, name, level, message)
+    print(msg)
+    if _LOG_SAVE and _LOG_HANDLER is not None:
+        _LOG_HANDLER.write(msg, level, (timestamp, name, level, message))
+    for handler in _LOG_HANDLERS:
+        handler.write(msg, level, (timestamp, name, level, message))
+
+
+def _count(name, index):
+    counts = _LOG_SUPPRESSED.get(name)
+    if counts is None:
+        counts = _LOG_SUPPRESSED[name] = [0, 0]
+    counts[index] += 1
+
+
+def _repeated(name):
+    """Output the repeat count of the last message of a logger if it was repeated."""
+    last = _LOG_LAST.get(name)
+    if last is not None and last[2]:
+        count, last[2] = last[2], 0
+        _output(None, name, last[0], ("last message repeated %d times", count))
+
+
+def _rate_limited(name, level, timestamp=None):
+    """Output the count of the messages of a logger and level suppressed by the rate limit since its last output."""
+    bucket = _LOG_BUCKETS.get((name, level))
+    if bucket is not None and bucket[2]:
+        count, bucket[2] = bucket[2], 0
+        _output(timestamp, name, level, ("%d messages suppressed by rate limit", count))
+
+
+def _suppressed(timestamp, name, level, message):
+    """Check if a record is a repeat of the last message or over the rate limit of its logger and level.
 
-    def __log(self, level, *message):
+    _LOG_LAST is {name: [level, message, repeats, ticks of the first repeat]} of the last output record,
+    _LOG_BUCKETS is {(name, level): [tokens, ticks, suppressed since the last output]}.
+    """
+    if _LOG_REPEAT:
+        last = _LOG_LAST.get(name)
+        if last is not None and last[0] == level and last[1] == message:
+            if not last[2]:
+                last[3] = utime.ticks_ms()
+            last[2] += 1
+            _count(name, 0)
+            if utime.ticks_diff(utime.ticks_ms(), last[3]) >= _LOG_REPEAT * 1000:
+                _repeated(name)
+            return True
+    if _LOG_RATE and level <= _LOG_RATE_LEVEL:
+        now = utime.ticks_ms()
+        key = (name, level)
+        bucket = _LOG_BUCKETS.get(key)
+        if bucket is None:
+            bucket = _LOG_BUCKETS[key] = [_LOG_BURST, now, 0]
+        else:
+            bucket[0] = min(_LOG_BURST, bucket[0] + utime.ticks_diff(now, bucket[1]) * _LOG_RATE / 1000)
+            bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            _count(name, 1)
+            return True
+        bucket[0] -= 1
+        _rate_limited(name, level, timestamp)
+    if _LOG_REPEAT:
+        _repeated(name)
+        _LOG_LAST[name] = [level, message, 0, 0]
+    return False
+
+
+def _emit(timestamp, name, level, message):
+    """Output a log record unless it is suppressed, runs under `_LOG_LOCK`."""
+    if (_LOG_REPEAT or _LOG_RATE) and _suppressed(timestamp, name, level, message):
+        return
+    _output(timestamp, name, level, message)
+
+
+class _CrashRing:
+    """This class is the RAM ring of recent log records of all levels, dumped to a file after a crash.
+
+    Records are kept as they were logged and only formatted when dumped. `put` takes no lock, a record logged
+    at the same time by another thread may be lost, which is acceptable for post-mortem context.
+    """
+
+    def __init__(self, size, path, interval):
+        self.__ring = [None] * size
+        self.__next = 0
+        self.__seq = 0
+        self.__dump_seq = 0
+        self.__dump_time = None
+        self.__path = path
+        self.__interval = interval
+        self.__lock = _thread.allocate_lock()
+
+    def put(self, record):
+        i = self.__next
+        self.__next = (i + 1) % len(self.__ring)
+        self.__ring[i] = record
+        self.__seq += 1
+
+    def records(self):
+        i = self.__next
+        return [record for record in self.__ring[i:] + self.__ring[:i] if record is not None]
+
+    def dump(self, e=None, force=True):
+        """Write the ring and the exception traceback to the crash log file.
+
+        Args:
+            e (Exception): exception of the crash. (default: None)
+            force (bool): False - skip if nothing was logged since the last dump or it was within the dump
+                          interval. (default: True)
+
+        Returns:
+            int: records written, -1 - skipped or failed.
+        """
+        if not self.__lock.acquire(0):
+            return -1
+        try:
+            if not force and (self.__seq == self.__dump_seq or (
+                self.__dump_time is not None and
+                utime.ticks_diff(utime.ticks_ms(), self.__dump_time) < self.__interval * 1000
+            )):
+                return -1
+            self.__dump_seq = self.__seq
+            self.__dump_time = utime.ticks_ms()
+            records = self.records()
+            with open(self.__path, "w") as f:
+                f.write("==== crash log {} ====\n".format(_strtime()))
+                for record in records:
+                    f.write(_line(*record) + "\n")
+                if e is not None:
+                    _print_exception(e, f)
+            return len(records)
+        except Exception as err:
+            _print_exception(err)
+            return -1
+        finally:
+            self.__lock.release()
+
+
+def _print_exception_hook(e, *args):
+    _print_exception(e, *args)
+    ring = _LOG_RING
+    if ring is not None:
+        ring.dump(e, False)
+
+
+class _AsyncWriter:
+    """This class is the log writer thread of the async mode.
+
+    Log calls only put the record in a bounded ring, the writer thread formats and outputs it. When the ring
+    is full a record is dropped by the policy of its level: `newest` drops the record being logged, `oldest`
+    drops the oldest queued record of the same or a lower level to make room for it, or the record being
+    logged if all queued records are more severe.
+    """
+
+    def __init__(self, size, policy):
+        self.__ring = [None] * size
+        self.__head = 0
+        self.__count = 0
+        self.__policy = policy
+        self.__drops = {}
+        self.__lock = _thread.allocate_lock()
+        self.__sem = _thread.allocate_lock()
+        self.__sem.acquire()
+        self.__running = 1
+        self.__busy = 0
+        _thread.stack_size(0x2000)
+        _thread.start_new_thread(self.__run, ())
+
+    def __drop(self, level):
+        self.__drops[level] = self.__drops.get(level, 0) + 1
+
+    def put(self, record):
+        size = len(self.__ring)
+        level = record[2]
+        with self.__lock:
+            if self.__count == size:
+                if self.__policy.get(level, "newest") != "oldest":
+                    self.__drop(level)
+                    return
+                # Evict the oldest record not above the level, a burst must not push out more severe records.
+                for i in range(self.__count):
+                    if self.__ring[(self.__head + i) % size][2] <= level:
+                        break
+                else:
+                    self.__drop(level)
+                    return
+                self.__drop(self.__ring[(self.__head + i) % size][2])
+                for j in range(i, 0, -1):
+                    self.__ring[(self.__head + j) % size] = self.__ring[(self.__head + j - 1) % size]
+                self.__ring[self.__head] = None
+                self.__head = (self.__head + 1) % size
+                self.__count -= 1
+            self.__ring[(self.__head + self.__count) % size] = record
+            self.__count += 1
+        if self.__sem.locked():
+            self.__sem.release()
+
+    def __get(self):
+        with self.__lock:
+            if not self.__count:
+                self.__busy = 0
+                return None
+            record = self.__ring[self.__head]
+            self.__ring[self.__head] = None
+            self.__head = (self.__head + 1) % len(self.__ring)
+            self.__count -= 1
+            self.__busy = 1
+            return record
+
+    def __run(self):
+        while True:
+            record = self.__get()
+            if record is None:
+                if not self.__running:
+                    break
+                self.__sem.acquire()
+                continue
+            try:
+                # Same lock as the sync mode, so a record is not written to a log file closed meanwhile.
+                with _LOG_LOCK:
+                    _emit(*record)
+            except Exception as e:
+                sys.print_exception(e)
+
+    def drain(self, timeout=1000):
+        """Wait until the queued records are output."""
+        start = utime.ticks_ms()
+        while (self.__count or self.__busy) and utime.ticks_diff(utime.ticks_ms(), start) < timeout:
+            utime.sleep_ms(10)
+
+    def drops(self):
+        with self.__lock:
+            return dict((_levelToName[level], count) for level, count in self.__drops.items())
+
+    def stop(self):
+        """Stop the writer thread after the queued records are output."""
+        self.__running = 0
+        if self.__sem.locked():
+            self.__sem.release()
+        self.drain()
+
+
+class Logger:
+    """This class is log output of one module.
+
+    Messages are the arguments joined by spaces, or printf-style when the first argument has `%`:
+    `log.debug("topic: %s, data: %s", topic, data)` is only formatted if DEBUG is output.
+    """
+
+    def __init__(self, name):
+        self.__name = name
+
+    def __log(self, level, message):
+        record = None
+        ring = _LOG_RING
+        if ring is not None:
+            record = (utime.time(), self.__name, level, message)
+            ring.put(record)
+        # Filtered records return before taking the lock, reading the time or formatting.
+        if not _enabled(level):
+            return
+        writer = _LOG_ASYNC
+        if writer is not None:
+            writer.put(record or (utime.time(), self.__name, level, message))
+            return
         with _LOG_LOCK:
-            if _LOG_DEBUG is False and ((_LOG_LEVEL == level == DEBUG) or level < _LOG_LEVEL):
-                return
-            _time = "{}-{:02d}-{:02d} {:02d}:{:02d}:{:02d}".format(*utime.localtime())
-            msg = "[{}][{}][{}]".format(_time, self.__name, _levelToName[level])
-            print(msg, *message)
-            if _LOG_SAVE:
-                msg = msg + " " + " ".join(message) if message else msg
-                self.__save_log(msg)
+            _emit(None, self.__name, level, message)
+
+    def isEnabledFor(self, level):
+        """Check if a level is output, e.g. to skip building expensive log arguments.
+
+        Args:
+            level (int): log level.
+
+        Returns:
+            bool: True - output, False - filtered.
+        """
+        return _enabled(level)
 
     def critical(self, *message):
-        self.__log(CRITICAL, *message)
+        self.__log(CRITICAL, message)
 
     def fatal(self, *message):
-        self.critical(*message)
+        self.__log(CRITICAL, message)
 
     def error(self, *message):
-        self.__log(ERROR, *message)
+        self.__log(ERROR, message)
 
     def warning(self, *message):
-        self.__log(WARNING, *message)
+        self.__log(WARNING, message)
 
     def warn(self, *message):
-        self.warning(*message)
+        self.__log(WARNING, message)
 
     def info(self, *message):
-        self.__log(INFO, *message)
+        self.__log(INFO, message)
 
     def debug(self, *message):
-        self.__log(DEBUG, *message)
+        self.__log(DEBUG, message)
+
+    def exception(self, e, *message):
+        """Log an ERROR with the exception, print its traceback and dump the crash log.
+
+        Args:
+            e (Exception): caught exception.
+            message: log message arguments.
+        """
+        self.__log(ERROR, message + (repr(e),))
+        _print_exception(e)
+        ring = _LOG_RING
+        if ring is not None:
+            ring.dump(e, False)
 
 
 def getLogger(name):
@@ -161,21 +980,37 @@ def getLogger(name):
     return _LOG_DICT[name]
 
 
-def setSaveLog(save, path=None, name=None, size=None, backups=None):
-    global _LOG_SAVE, _LOG_SIZE, _LOG_BACK, _LOG_PATH, _LOG_NAME, _LOG_FILE
+def setSaveLog(save, path=None, name=None, size=None, backups=None, buffer_size=None, period=None, binary=False):
+    global _LOG_SAVE, _LOG_SIZE, _LOG_BACK, _LOG_PATH, _LOG_NAME, _LOG_FILE, _LOG_BUFFER, _LOG_PERIOD, _LOG_HANDLER, \
+        _LOG_BINARY
 
     assert isinstance(save, bool), "Args save is not bool"
     if save:
         assert isinstance(size, int) and size > 0, "Args size is not int."
         assert isinstance(backups, int) and backups > 0, "Args backups is not int."
 
-    _LOG_SAVE = save
-    path += "/" if not path.endswith("/") else ""
-    _LOG_PATH = path
-    _LOG_NAME = name
-    _LOG_FILE = _LOG_PATH + _LOG_NAME
-    _LOG_SIZE = size
-    _LOG_BACK = backups
+    # Records queued before the change go to the current log file.
+    if _LOG_ASYNC is not None:
+        _LOG_ASYNC.drain()
+    with _LOG_LOCK:
+        if _LOG_HANDLER is not None:
+            _LOG_HANDLER.close()
+            _LOG_HANDLER = None
+        _LOG_SAVE = save
+        if not save:
+            return True
+        path += "/" if not path.endswith("/") else ""
+        _LOG_PATH = path
+        _LOG_NAME = name
+        _LOG_FILE = _LOG_PATH + _LOG_NAME
+        _LOG_SIZE = size
+        _LOG_BACK = backups
+        _LOG_BUFFER = _LOG_BUFFER if buffer_size is None else buffer_size
+        _LOG_PERIOD = _LOG_PERIOD if period is None else period
+        _LOG_BINARY = binary
+        _LOG_HANDLER = FileHandler(
+            _LOG_PATH, _LOG_NAME, _LOG_SIZE, _LOG_BACK, _LOG_BUFFER, _LOG_PERIOD, _LOG_BINARY
+        )
     return True
 
 
@@ -183,6 +1018,182 @@ def getSaveLog():
     return _LOG_SAVE
 
 
+def addLogHandler(handler):
+    """Add a log output besides console and log file, e.g. `LogShipper`.
+
+    Args:
+        handler: object with `write(msg, level, record)`, called with each output log line.
+
+    Returns:
+        bool: True - success, False - failed.
+    """
+    with _LOG_LOCK:
+        if handler in _LOG_HANDLERS or not callable(getattr(handler, "write", None)):
+            return False
+        _LOG_HANDLERS.append(handler)
+    return True
+
+
+def removeLogHandler(handler):
+    with _LOG_LOCK:
+        if handler in _LOG_HANDLERS:
+            _LOG_HANDLERS.remove(handler)
+    return True
+
+
+def readLog():
+    """Iterate the saved text log lines, oldest first.
+
+    A binary log raises ValueError, it is converted to text by `tools/logdecode.py` on the host.
+
+    Returns:
+        iterator: log lines without line end.
+    """
+    handler = _LOG_HANDLER
+    if (_LOG_BINARY if handler is None else handler.binary):
+        raise ValueError("binary log, convert it with tools/logdecode.py.")
+    if handler is None:
+        handler = FileHandler(_LOG_PATH, _LOG_NAME, _LOG_SIZE, _LOG_BACK, 0, 0)
+    return handler.lines()
+
+
+def flushLog():
+    """Write buffered log lines to the log file, e.g. before reset or power down."""
+    if _LOG_ASYNC is not None:
+        _LOG_ASYNC.drain()
+    if _LOG_LAST or _LOG_BUCKETS:
+        with _LOG_LOCK:
+            for name in list(_LOG_LAST):
+                _repeated(name)
+            for name, level in list(_LOG_BUCKETS):
+                _rate_limited(name, level)
+    if _LOG_HANDLER is not None:
+        _LOG_HANDLER.flush()
+
+
+def setLogAsync(enable, size=64, policy=None):
+    """Set async log mode.
+
+    In async mode log calls only queue the record, formatting, console and file output run in a writer thread.
+
+    Args:
+        enable (bool): True - async, False - output in the logging thread.
+        size (int): max queued records. (default: 64)
+        policy (dict): {level: "oldest" / "newest"}, record dropped when the queue is full.
+                       (default: None, DEBUG / INFO drop the newest, WARNING and above drop the oldest)
+
+    Returns:
+        bool: True - success, False - failed.
+    """
+    global _LOG_ASYNC
+    if not isinstance(enable, bool) or not (isinstance(size, int) and size > 0):
+        return False
+    if policy is None:
+        policy = {DEBUG: "newest", INFO: "newest", WARNING: "oldest", ERROR: "oldest", CRITICAL: "oldest"}
+    writer, _LOG_ASYNC = _LOG_ASYNC, None
+    if writer is not None:
+        writer.stop()
+    if enable:
+        try:
+            _LOG_ASYNC = _AsyncWriter(size, policy)
+        except Exception as e:
+            sys.print_exception(e)
+            return False
+    return True
+
+
+def getLogAsync():
+    return _LOG_ASYNC is not None
+
+
+def getLogDrops():
+    """Get records dropped in async mode because the queue was full.
+
+    Returns:
+        dict: {level name: count}
+    """
+    return _LOG_ASYNC.drops() if _LOG_ASYNC is not None else {}
+
+
+def setCrashLog(size, path=None, interval=60, hook=True):
+    """Set the RAM crash log.
+
+    The last `size` log records of all levels are kept in RAM, also those filtered from console and file
+    output, and only written to the crash log file by `dumpCrashLog`, `Logger.exception` or, with `hook`,
+    `sys.print_exception` on firmware where it can be replaced.
+
+    Args:
+        size (int): records kept, 0 - disable.
+        path (str): crash log file. (default: None, `/usr/crash.log`)
+        interval (int): min interval of automatic dumps (s). (default: 60)
+        hook (bool): True - dump on `sys.print_exception`. (default: True)
+
+    Returns:
+        bool: True - success, False - failed.
+    """
+    global _LOG_RING
+    if not (isinstance(size, int) and size >= 0):
+        return False
+    _LOG_RING = _CrashRing(size, path or "/usr/crash.log", interval) if size else None
+    try:
+        sys.print_exception = _print_exception_hook if size and hook else _print_exception
+    except (AttributeError, TypeError):
+        pass
+    return True
+
+
+def dumpCrashLog(e=None):
+    """Write the RAM crash log to its file now.
+
+    Args:
+        e (Exception): exception whose traceback is appended. (default: None)
+
+    Returns:
+        int: records written, -1 - crash log disabled or failed.
+    """
+    return _LOG_RING.dump(e) if _LOG_RING is not None else -1
+
+
+def setLogSuppress(repeat=0, rate=0, burst=10, level=INFO):
+    """Set log suppression.
+
+    Identical messages repeated by a logger are output once, followed by "last message repeated N times" when
+    another message is output, at least every `repeat` seconds or on `flushLog`. Records of `level` and below
+    are limited to `rate` per second per logger and level, with bursts of up to `burst` records, the number
+    suppressed is output before the next record that passes.
+
+    Args:
+        repeat (int): max period of repeat counts (s), 0 - no repeat suppression. (default: 0)
+        rate (float): records per second per logger and level, 0 - no rate limit. (default: 0)
+        burst (int): max records output at once. (default: 10)
+        level (int): highest rate limited level. (default: INFO)
+
+    Returns:
+        bool: True - success, False - failed.
+    """
+    global _LOG_REPEAT, _LOG_RATE, _LOG_BURST, _LOG_RATE_LEVEL
+    if not (isinstance(repeat, int) and repeat >= 0 and isinstance(rate, (int, float)) and rate >= 0 and
+            isinstance(burst, int) and burst > 0 and _levelToName.get(level) is not None):
+        return False
+    flushLog()
+    with _LOG_LOCK:
+        _LOG_REPEAT, _LOG_RATE, _LOG_BURST, _LOG_RATE_LEVEL = repeat, rate, burst, level
+        _LOG_LAST.clear()
+        _LOG_BUCKETS.clear()
+    return True
+
+
+def getLogSuppressed():
+    """Get records suppressed by `setLogSuppress`.
+
+    Returns:
+        dict: {logger name: {"repeated": count, "limited": count}}
+    """
+    return dict(
+        (name, {"repeated": counts[0], "limited": counts[1]}) for name, counts in _LOG_SUPPRESSED.items()
+    )
+
+
 def setLogLevel(level):
     global _LOG_LEVEL
     if isinstance(level, str) and _nameToLevel.get(level.upper()) is not None:
@@ -160,7 +160,7 @@ class NetManager:
         dataCall.setCallback(self.__net_callback)
 
     def __net_callback(self, args):
-        log.debug("profile id[%s], net state[%s], last args[%s]" % args)
+        log.debug("profile id[%s], net state[%s], last args[%s]", *args)
         if args[1] == 0:
             self.__net_check_timer.stop()
             self.net_check(None)
@@ -183,10 +183,10 @@ class NetManager:
             # Reconnect net.
             if net.getModemFun() != 1:
                 _res = self.net_disconnect()
-                log.debug("net_connect net_disconnect %s" % _res)
+                log.debug("net_connect net_disconnect %s", _res)
                 time.sleep(5)
                 _res = net.setModemFun(1)
-                log.debug("net.setModemFun(1) %s" % _res)
+                log.debug("net.setModemFun(1) %s", _res)
                 if _res != 0:
                     return -3
 
@@ -197,7 +197,7 @@ class NetManager:
 
             # Wait net connect.
             _res = checkNet.waitNetworkReady(300)
-            log.debug("checkNet.waitNetworkReady %s" % str(_res))
+            log.debug("checkNet.waitNetworkReady %s", _res)
             res = 0 if _res == (3, 1) else -5
         except Exception as e:
             sys.print_exception(e)
@@ -232,7 +232,7 @@ class NetManager:
     def net_state(self):
         try:
             _net_state_ = net.getState()
-            log.debug("net.getState() %s" % str(_net_state_))
+            log.debug("net.getState() %s", _net_state_)
             return True if isinstance(_net_state_, tuple) and len(_net_state_) >= 2 and _net_state_[1][0] in (1, 5) else False
         except Exception as e:
             sys.print_exception(e)
@@ -271,7 +271,7 @@ class NetManager:
     def call_state(self):
         try:
             call_info = self.call_info()
-            log.debug("dataCall.getInfo %s" % str(call_info))
+            log.debug("dataCall.getInfo %s", call_info)
             return True if isinstance(call_info, tuple) and len(call_info) >= 3 and call_info[2][0] == 1 else False
         except Exception as e:
             sys.print_exception(e)
@@ -131,10 +131,10 @@ class PowerManage:
             self.__init_tau(tau)
             self.__init_act(act)
             res = pm.set_psm_time(self.__tau_unit, self.__tau_time, self.__act_unit, self.__act_time)
-            log.info("set_psm_time: %s" % res)
+            log.info("set_psm_time: %s", res)
             if res:
                 get_psm_res = pm.get_psm_time()
-                log.debug("get_psm_res: %s" % str(get_psm_res))
+                log.debug("get_psm_res: %s", get_psm_res)
                 if get_psm_res[0] == 1 and get_psm_res[1:] == [self.__tau_unit, self.__tau_time, self.__act_unit, self.__act_time]:
                     log.debug("PSM time equal set time.")
             return res
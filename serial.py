@@ -21,6 +21,7 @@ date: 2023-2-14
 功能描述: 封装Serial类, 实现基于QuecPython的串口通信阻塞/非阻塞读操作。
 """
 
+import _thread
 from machine import UART, Timer
 
 try:
@@ -47,20 +48,76 @@ class TimerContext(object):
 
 
 class Serial(object):
-    """串口通信"""
+    """串口通信
 
-    def __init__(self, port=2, baudrate=115200, bytesize=8, parity=0, stopbits=1, flowctl=0):
+    received bytes are kept in an internal rx buffer, filled from the uart callback when `rx_size` > 0,
+    otherwise by the reading calls. readline / read_until / read_frame take from it, bytes after a line or
+    frame stay there for the next call.
+    """
+
+    def __init__(self, port=2, baudrate=115200, bytesize=8, parity=0, stopbits=1, flowctl=0, rx_size=0):
         port = getattr(UART, 'UART{}'.format(port))
         self.__uart = UART(port, baudrate, bytesize, parity, stopbits, flowctl)
         self.__uart.set_callback(self.__uart_cb)
         self.__cond = Condition()
+        self.__readinto = getattr(self.__uart, "readinto", None)
+        self.__buf = bytearray(0)
+        self.__expired = False
+        self.__push = rx_size > 0
+        self.__rx = bytearray(rx_size if rx_size > 0 else 512)
+        self.__rx_mv = memoryview(self.__rx)
+        self.__start = 0
+        self.__end = 0
+        self.__rx_lock = _thread.allocate_lock()
 
     def __uart_cb(self, args):
+        if self.__push:
+            with self.__rx_lock:
+                self.__fill(False)
         self.__cond.notify(info=False)
 
     def __timer_cb(self, args):
+        self.__expired = True
         self.__cond.notify(info=True)
 
+    def __uart_read(self, mv):
+        """read the bytes available in the uart into mv, return the number of bytes read."""
+        count = min(self.__uart.any(), len(mv))
+        if not count:
+            return 0
+        if self.__readinto is not None:
+            return self.__readinto(mv[:count]) or 0
+        data = self.__uart.read(count)
+        mv[:len(data)] = data
+        return len(data)
+
+    def __fill(self, compact=True):
+        """
+        move the bytes available in the uart to the rx buffer, return the number of bytes moved. call with rx lock.
+        the uart callback does not compact, so a frame returned by read_frame stays valid until the next read call.
+        """
+        if compact and self.__start and self.__end > len(self.__rx) // 2:
+            size = self.__end - self.__start
+            self.__rx_mv[:size] = bytes(self.__rx_mv[self.__start:self.__end])
+            self.__start, self.__end = 0, size
+        count = self.__uart_read(self.__rx_mv[self.__end:])
+        self.__end += count
+        return count
+
+    def __take(self, mv):
+        """copy buffered bytes to mv, return the number of bytes copied. call with rx lock."""
+        count = min(self.__end - self.__start, len(mv))
+        if count:
+            mv[:count] = self.__rx_mv[self.__start:self.__start + count]
+            self.__start += count
+            if self.__start == self.__end:
+                self.__start = self.__end = 0
+        return count
+
+    def __wait(self, timeout):
+        """wait for uart data, return True if reading should stop."""
+        return timeout == 0 or self.__expired or self.__cond.wait()
+
     def write(self, data):
         self.__uart.write(data)
 
@@ -71,16 +128,216 @@ class Serial(object):
         :param timeout: int(ms). =0 for no blocking, <0 for block forever, >0 for block until timeout.
         :return: bytes actually read.
         """
-        if timeout == 0:
-            return self.__uart.read(size)
+        if len(self.__buf) < size:
+            self.__buf = bytearray(size)
+        mv = memoryview(self.__buf)[:size]
+        return bytes(mv[:self.readinto(mv, timeout)])
 
-        r_data = b''
+    def readinto(self, buf, timeout=0):
+        """
+        read from uart port into a buffer without allocating the result.
+        all bytes available are read in one call, blocking only while the uart has no data.
+        :param buf: bytearray or memoryview, filled from the start, len(buf) bytes are wanted.
+        :param timeout: int(ms). =0 for no blocking, <0 for block forever, >0 for block until timeout.
+        :return: int, number of bytes read.
+        """
+        mv = buf if isinstance(buf, memoryview) else memoryview(buf)
+        size = len(mv)
+        n = 0
+        self.__expired = False
+        with TimerContext(timeout, self.__timer_cb):
+            while True:
+                with self.__rx_lock:
+                    count = self.__take(mv[n:])
+                    if n + count < size and self.__start == self.__end:
+                        count += self.__uart_read(mv[n + count:])
+                    n += count
+                # Keep draining while bytes arrive, a wakeup sent during the copy is not waited for.
+                if n >= size or (not count and self.__wait(timeout)):
+                    break
+        return n
+
+    def read_until(self, delim=b'\n', timeout=0, max_size=None):
+        """
+        read until a delimiter.
+        :param delim: bytes, delimiter, included in the result.
+        :param timeout: int(ms). =0 for no blocking, <0 for block forever, >0 for block until timeout.
+        :param max_size: int, return after max_size bytes without the delimiter. default: rx buffer size.
+        :return: bytes, up to and including the delimiter, b'' on timeout, the bytes received stay buffered.
+        """
+        max_size = min(max_size or len(self.__rx), len(self.__rx))
+        searched = 0
+        self.__expired = False
+        with TimerContext(timeout, self.__timer_cb):
+            while True:
+                with self.__rx_lock:
+                    count = self.__fill()
+                    start = self.__start
+                    end = min(self.__end, start + max_size)
+                    index = bytes(self.__rx_mv[start + searched:end]).find(delim)
+                    if index >= 0:
+                        end = start + searched + index + len(delim)
+                    elif end - start < max_size:
+                        searched = max(0, end - start - len(delim) + 1)
+                        end = None
+                    if end is not None:
+                        self.__start = end
+                        return bytes(self.__rx_mv[start:end])
+                if not count and self.__wait(timeout):
+                    return b''
+
+    def readline(self, timeout=0, max_size=None):
+        """
+        read a line ending with b'\n', see read_until.
+        """
+        return self.read_until(b'\n', timeout, max_size)
+
+    def read_frame(self, framer, timeout=0):
+        """
+        read a frame with a framer, e.g. LineFramer, SlipFramer, CobsFramer or LengthFramer.
+        bytes the framer discards are dropped, a full rx buffer without a frame is dropped.
+        :param framer: object with find(mv) -> None for more bytes, or (start, end, consumed) of the buffered
+                       bytes, start None to only drop `consumed` bytes. mv may be decoded in place.
+                       an optional `max_frame` is the most bytes a frame takes in the rx buffer.
+        :param timeout: int(ms). =0 for no blocking, <0 for block forever, >0 for block until timeout.
+        :return: memoryview of the frame in the rx buffer, valid until the next read call. None on timeout.
+        :raise ValueError: the framer's max_frame is larger than the rx buffer, such frames would be dropped.
+        """
+        if getattr(framer, "max_frame", 0) > len(self.__rx):
+            raise ValueError("framer max_frame {} is larger than rx buffer {}".format(framer.max_frame, len(self.__rx)))
+        self.__expired = False
         with TimerContext(timeout, self.__timer_cb):
-            while len(r_data) < size:
-                raw = self.__uart.read(1)
-                if not raw:
-                    if self.__cond.wait():
-                        break
-                else:
-                    r_data += raw
-        return r_data
+            while True:
+                with self.__rx_lock:
+                    count = self.__fill()
+                    while self.__end > self.__start:
+                        base = self.__start
+                        found = framer.find(self.__rx_mv[base:self.__end])
+                        if found is None:
+                            if base == 0 and self.__end == len(self.__rx):
+                                self.__start = self.__end = 0
+                            break
+                        start, end, consumed = found
+                        self.__start = base + consumed
+                        if start is not None:
+                            return self.__rx_mv[base + start:base + end]
+                if not count and self.__wait(timeout):
+                    return None
+
+    def frames(self, framer, timeout=0):
+        """
+        yield frames until no frame arrives within the timeout, see read_frame.
+        """
+        while True:
+            frame = self.read_frame(framer, timeout)
+            if frame is None:
+                break
+            yield frame
+
+
+class LineFramer(object):
+    """frames ending with a delimiter, the frame excludes it. lines over max_size are dropped."""
+
+    def __init__(self, delim=b'\n', max_size=256):
+        self.delim = delim
+        self.max_size = max_size
+        self.max_frame = max_size + len(delim)
+        self.discard = False
+
+    def find(self, mv):
+        index = bytes(mv[:self.max_size + len(self.delim)]).find(self.delim)
+        if index >= 0:
+            discard, self.discard = self.discard, False
+            return None if discard else 0, index, index + len(self.delim)
+        if len(mv) > self.max_size:
+            # drop the long line up to its delimiter.
+            self.discard = True
+            return None, None, self.max_size
+        return None
+
+
+class SlipFramer(object):
+    """SLIP (RFC 1055) frames, decoded in place. empty frames are skipped."""
+    END = 0xC0
+    ESC = 0xDB
+    ESC_END = 0xDC
+    ESC_ESC = 0xDD
+
+    def find(self, mv):
+        end = bytes(mv).find(b'\xc0')
+        if end < 0:
+            return None
+        if end == 0:
+            return None, None, 1
+        n = 0
+        i = 0
+        while i < end:
+            byte = mv[i]
+            if byte == self.ESC and i + 1 < end:
+                i += 1
+                byte = self.END if mv[i] == self.ESC_END else self.ESC if mv[i] == self.ESC_ESC else mv[i]
+            mv[n] = byte
+            n += 1
+            i += 1
+        return 0, n, end + 1
+
+
+class CobsFramer(object):
+    """COBS frames delimited by 0x00, decoded in place. frames with a bad code are dropped."""
+
+    def find(self, mv):
+        end = bytes(mv).find(b'\x00')
+        if end < 0:
+            return None
+        if end == 0:
+            return None, None, 1
+        n = 0
+        i = 0
+        while i < end:
+            code = mv[i]
+            if i + code > end:
+                return None, None, end + 1
+            mv[n:n + code - 1] = bytes(mv[i + 1:i + code])
+            n += code - 1
+            i += code
+            if code < 0xFF and i < end:
+                mv[n] = 0
+                n += 1
+        return 0, n, end + 1
+
+
+def crc16(data, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE of data."""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+class LengthFramer(object):
+    """frames of a big endian length field, the payload and an optional big endian CRC-16/CCITT-FALSE of the
+    payload. the frame is the payload. on a bad length or CRC one byte is dropped to resync.
+    max_size is the largest payload, the whole frame must fit the rx buffer of the Serial."""
+
+    def __init__(self, size=2, crc=True, max_size=256):
+        self.size = size
+        self.crc = crc
+        self.max_size = max_size
+        self.max_frame = size + max_size + (2 if crc else 0)
+
+    def find(self, mv):
+        size = self.size
+        if len(mv) < size:
+            return None
+        length = 0
+        for i in range(size):
+            length = (length << 8) | mv[i]
+        if length > self.max_size:
+            return None, None, 1
+        total = size + length + (2 if self.crc else 0)
+        if len(mv) < total:
+            return None
+        if self.crc and crc16(mv[size:size + length]) != (mv[total - 2] << 8) | mv[total - 1]:
+            return None, None, 1
+        return size, size + length, total
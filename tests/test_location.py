@@ -0,0 +1,552 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :test_location.py
+@brief     :Host tests of location.py.
+
+Usage:
+    pytest
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+import host_env  # noqa: E402
+
+host_env.install()
+from modules import location  # noqa: E402
+from modules.location import GNSSBase, GNSSFix, MTKDialect, NMEAParse, nmea_sentence  # noqa: E402
+
+RMC = nmea_sentence("GNRMC,123456.000,A,3149.333008,N,11707.083336,E,1.19,19.23,181026,,,A")
+
+
+class TestNMEAParse(unittest.TestCase):
+
+    def setUp(self):
+        self.parse = NMEAParse()
+
+    def test_split_sentence(self):
+        data = RMC.encode()
+        self.assertEqual(self.parse.feed(data[:20]), set())
+        self.assertEqual(self.parse.feed(data[20:]), {"RMC"})
+        self.assertEqual(self.parse.GxRMCData[1], "123456.000")
+        self.assertEqual(self.parse.GxRMC, RMC[:-2])
+        self.assertEqual(self.parse.stats(), {"good": 1, "bad_checksum": 0, "dropped": 0})
+
+    def test_bad_checksum(self):
+        bad = RMC[:-4] + ("%02X" % (int(RMC[-4:-2], 16) ^ 1)) + "\r\n"
+        self.assertEqual(self.parse.feed(bad.encode()), set())
+        self.assertEqual(self.parse.GxRMCData, ())
+        self.assertEqual(self.parse.stats()["bad_checksum"], 1)
+
+    def test_interrupted_sentence(self):
+        self.assertEqual(self.parse.feed(("$GNRMC,123455.000,A,31" + RMC).encode()), {"RMC"})
+        self.assertEqual(self.parse.GxRMCData[1], "123456.000")
+        self.assertEqual(self.parse.stats(), {"good": 1, "bad_checksum": 0, "dropped": 1})
+
+    def test_fragment_length_cap(self):
+        self.parse.feed(b"$GNRMC," + b"1" * NMEAParse._FRAGMENT_MAX)
+        self.assertEqual(self.parse.stats()["dropped"], 1)
+        # The dropped fragment is not joined to the next chunk.
+        self.assertEqual(self.parse.feed(RMC.encode()), {"RMC"})
+        self.assertEqual(self.parse.stats()["good"], 1)
+
+    def test_non_ascii_sentence_id(self):
+        self.parse.feed(b"$GN\xff\xfeC,1*00\r\n$GN\xc3\xa9C,1*00\r\n" + RMC.encode())
+        self.assertEqual(self.parse.stats(), {"good": 1, "bad_checksum": 1, "dropped": 0})
+        self.assertEqual(self.parse.GxRMCData[1], "123456.000")
+
+
+class _SendGNSS(GNSSBase):
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def _send(self, data):
+        self.sent.append(data)
+        return True
+
+
+class TestMTKAid(unittest.TestCase):
+
+    def test_pmtk741_has_seconds(self):
+        fix = GNSSFix(0, 31.8222168, 117.1180556, 0.0, 0.0, 45.7, 0.9, 8)
+        commands = MTKDialect().aid(fix, (2026, 10, 18, 12, 34, 56, 0, 0))
+        self.assertEqual(commands[1], "PMTK741,31.822217,117.118056,45,2026,10,18,12,34,56")
+
+    def test_aid_sentence_sent(self):
+        utime = sys.modules["utime"]
+        fix_time = utime.mktime((2026, 10, 18, 12, 34, 56, 0, 0))
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"fix": [fix_time, 31.8222168, 117.1180556, 0.0, 0.0, 45.7, 0.9, 8], "rtc": utime.time()}, f)
+        try:
+            gnss = _SendGNSS()
+            self.assertTrue(gnss.set_state_file(path, 0))
+            gnss._aid()
+        finally:
+            os.remove(path)
+        self.assertEqual(len(gnss.sent), 2)
+        self.assertTrue(gnss.sent[0].startswith("$PMTK740,2026,10,18,12,34,5"))
+        # The RTC may tick between saving and aiding, the seconds field is checked by value.
+        body = gnss.sent[1][1:gnss.sent[1].index("*")]
+        self.assertEqual(gnss.sent[1], nmea_sentence(body))
+        fields = body.split(",")
+        self.assertEqual(fields[:8], ["PMTK741", "31.822217", "117.118056", "45", "2026", "10", "18", "12"])
+        self.assertEqual(len(fields), 10)
+        self.assertIn(fields[8:], (["34", "56"], ["34", "57"]))
+
+
+class _AckGNSS(GNSSBase):
+    """Receiver answering each command with `reply(body, attempt)`, None - no answer."""
+
+    def __init__(self, reply):
+        super().__init__()
+        self.reply = reply
+        self.sent = []
+        self._GNSSBase__running = 1
+
+    def _send(self, data):
+        body = data[1:data.index("*")]
+        self.sent.append(body)
+        answer = self.reply(body, self.sent.count(body))
+        if answer is not None:
+            self._parse_loc(nmea_sentence(answer).encode())
+        return True
+
+
+class TestConfigure(unittest.TestCase):
+
+    def test_mtk(self):
+        gnss = _AckGNSS(lambda body, attempt: "PMTK001,%s,3" % body[4:7])
+        self.assertTrue(gnss.configure("MTK", {"RMC": 1, "GGA": 1}, 1000, timeout=50))
+        self.assertEqual(gnss.sent, ["PMTK220,1000", "PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0"])
+        self.assertEqual(gnss._GNSSBase__config, {"dialect": "MTK", "rate": 1000, "sentences": {"RMC": 1, "GGA": 1}})
+
+    def test_mtk_rejected(self):
+        gnss = _AckGNSS(lambda body, attempt: "PMTK001,%s,2" % body[4:7])
+        self.assertFalse(gnss.configure("MTK", rate=1000, timeout=50))
+        self.assertEqual(gnss.sent, ["PMTK220,1000"])
+        self.assertEqual(gnss._GNSSBase__config, {})
+
+    def test_retry(self):
+        # The first command is not answered, its retry is.
+        gnss = _AckGNSS(lambda body, attempt: "PMTK001,220,3" if attempt > 1 else None)
+        self.assertTrue(gnss.configure("MTK", rate=1000, timeout=50, retry=1))
+        self.assertEqual(gnss.sent, ["PMTK220,1000", "PMTK220,1000"])
+        gnss = _AckGNSS(lambda body, attempt: None)
+        self.assertFalse(gnss.configure("MTK", rate=1000, timeout=50, retry=2))
+        self.assertEqual(len(gnss.sent), 3)
+
+    def test_other_acknowledgement_ignored(self):
+        gnss = _AckGNSS(lambda body, attempt: "PMTK001,314,3")
+        self.assertFalse(gnss.configure("MTK", rate=1000, timeout=50, retry=0))
+
+    def test_pair(self):
+        gnss = _AckGNSS(lambda body, attempt: "PAIR001,%s,0" % body[4:7])
+        self.assertTrue(gnss.configure("PAIR", {"RMC": 1}, 500, timeout=50))
+        self.assertEqual(gnss.sent[:3], ["PAIR050,500", "PAIR062,0,0", "PAIR062,1,0"])
+        self.assertIn("PAIR062,4,1", gnss.sent)
+        self.assertEqual(len(gnss.sent), 8)
+
+    def test_pq(self):
+        def reply(body, attempt):
+            if body.startswith("PAIR"):
+                return "PAIR001,%s,0" % body[4:7]
+            return "%s,%s" % (body.split(",", 1)[0], "ERROR" if ",GSV," in body else "OK")
+
+        gnss = _AckGNSS(reply)
+        self.assertTrue(gnss.configure("PQ", rate=200, timeout=50))
+        self.assertFalse(gnss.configure("PQ", {"RMC": 1, "GSV": 5}, timeout=50))
+        self.assertIn("PQTMCFGMSGRATE,W,GSV,5", gnss.sent)
+        self.assertEqual(gnss._GNSSBase__config, {"dialect": "PQ", "rate": 200})
+
+    def test_not_running(self):
+        gnss = _AckGNSS(lambda body, attempt: "PMTK001,220,3")
+        gnss._GNSSBase__running = 0
+        self.assertFalse(gnss.configure("MTK", rate=1000))
+        self.assertEqual(gnss.sent, [])
+
+
+def _gsv(talker, total, num, in_view, sats, signal="1"):
+    fields = [talker + "GSV", str(total), str(num), str(in_view)]
+    for sat in sats:
+        fields += [str(v) for v in sat]
+    return nmea_sentence(",".join(fields + [signal]))
+
+
+class TestSatellites(unittest.TestCase):
+
+    def test_multi_part_sequences(self):
+        gnss = _SendGNSS()
+        gnss._parse_loc((
+            _gsv("GP", 2, 1, 5, ((1, 10, 20, 30), (2, 11, 21, 31), (3, 12, 22, 0), (4, 13, 23, 33)))
+            + _gsv("GP", 2, 2, 5, ((5, 14, 24, 34),))
+            + _gsv("BD", 1, 1, 2, ((7, 84, 161, 0), (10, 78, 301, 23)))
+        ).encode())
+        rows = gnss.read(3)
+        self.assertEqual([(row[0], row[1]) for row in rows], [("GP", 1), ("GP", 2), ("GP", 3), ("GP", 4), ("GP", 5),
+                                                              ("BD", 7), ("BD", 10)])
+        self.assertEqual(rows[0], ("GP", 1, 10, 20, 30, 1))
+        self.assertEqual(gnss._GNSSBase__nmea_parse.Satellites.in_view(), 7)
+
+    def test_new_sequence_replaces_constellation(self):
+        gnss = _SendGNSS()
+        gnss._parse_loc((
+            _gsv("GP", 1, 1, 2, ((1, 10, 20, 30), (2, 11, 21, 31)))
+            + _gsv("BD", 1, 1, 1, ((7, 84, 161, 0),))
+        ).encode())
+        # Part 2 is lost, part 3 of the sequence is ignored.
+        gnss._parse_loc((
+            _gsv("GP", 3, 1, 9, ((3, 12, 22, 32),))
+            + _gsv("GP", 3, 3, 9, ((9, 12, 22, 32),))
+        ).encode())
+        self.assertEqual([(row[0], row[1]) for row in gnss.read(3)], [("BD", 7), ("GP", 3)])
+
+    def test_signals_kept_apart(self):
+        gnss = _SendGNSS()
+        gnss._parse_loc((
+            _gsv("GP", 1, 1, 1, ((1, 10, 20, 30),), "1")
+            + _gsv("GP", 1, 1, 1, ((1, 10, 20, 25),), "8")
+        ).encode())
+        self.assertEqual(gnss.read(3), [("GP", 1, 10, 20, 30, 1), ("GP", 1, 10, 20, 25, 8)])
+        self.assertEqual(gnss._GNSSBase__nmea_parse.Satellites.in_view(), 1)
+
+
+class TestHistory(unittest.TestCase):
+
+    def _feed(self, gnss, *seconds):
+        for second in seconds:
+            gnss._parse_loc((
+                nmea_sentence("GNGGA,1234%d.50,3149.333008,N,11707.083336,E,1,9,1.30,98.483,M,-0.336,M,," % second)
+                + nmea_sentence("GNRMC,1234%d.50,A,3149.333008,N,11707.083336,E,,,181026,,,A" % second)
+            ).encode())
+
+    def test_read_modes(self):
+        gnss = _SendGNSS()
+        self._feed(gnss, 55, 56)
+        current = gnss.read(0)
+        history = gnss.read(1)
+        self.assertEqual(len(history), 2)
+        self.assertEqual(sorted(history[-1]), sorted(current))
+        # Mode 0 keeps the receiver fields, missing values stay missing.
+        self.assertEqual(current["timestamp"], "123456.50")
+        self.assertEqual(current["lat"], str(31 + 49.333008 / 60))
+        self.assertIsNone(current["speed"])
+        self.assertEqual(current["course"], "")
+        self.assertEqual(history[-1]["lat"], "31.822217")
+        self.assertEqual(history[0]["timestamp"], "123455.000")
+        # 31.8222168 is kept as 31822217 micro-degrees, not truncated.
+        self.assertEqual(gnss.read_history(1)[0].lat, 31.822217)
+
+    def test_read_history_count(self):
+        gnss = _SendGNSS()
+        self._feed(gnss, 54, 55, 56)
+        self.assertEqual(len(gnss.read_history(0)), 0)
+        self.assertEqual(len(gnss.read_history(0, since=0)), 0)
+        self.assertEqual(len(gnss.read_history(4)), 3)
+        self.assertEqual(len(gnss.read_history(4, since=0)), 3)
+        self.assertEqual([fix.time % 60 for fix in gnss.read_history(2, since=0)], [55, 56])
+
+    def test_parse_memoryview(self):
+        gnss = _SendGNSS()
+        data = RMC.encode()
+        buf = bytearray(data)
+        gnss._parse_loc(memoryview(buf))
+        self.assertEqual(gnss.read(0)["lat"], str(31 + 49.333008 / 60))
+        self.assertEqual(gnss.read(2), data)
+
+
+def _rmc(second):
+    return nmea_sentence("GNRMC,1234%02d.000,A,3149.333008,N,11707.083336,E,1.19,19.23,181026,,,A" % second)
+
+
+def _gga(second, altitude):
+    return nmea_sentence("GNGGA,1234%02d.000,3149.333008,N,11707.083336,E,1,9,1.30,%d,M,-0.336,M,," % (second, altitude))
+
+
+class TestEpochs(unittest.TestCase):
+
+    def setUp(self):
+        self.gnss = _SendGNSS()
+        self.fixes = []
+        self.gnss.subscribe(self.fixes.append)
+
+    def _fixes(self):
+        return [(fix.time % 60, fix.altitude) for fix in self.fixes]
+
+    def test_gga_after_rmc(self):
+        self.gnss._parse_loc((_rmc(1) + _gga(1, 10) + _rmc(2) + _gga(2, 11) + _rmc(3) + _gga(3, 12)).encode())
+        self.assertEqual(self._fixes(), [(1, 10), (2, 11), (3, 12)])
+        self.assertEqual(len(self.gnss.read(1)), 3)
+
+    def test_gga_before_rmc(self):
+        self.gnss._parse_loc((_gga(1, 10) + _rmc(1) + _gga(2, 11) + _rmc(2) + _rmc(3)).encode())
+        # The third epoch has no GGA, it does not take the altitude of the second one.
+        self.assertEqual(self._fixes(), [(1, 10), (2, 11), (3, 0)])
+
+    def test_gga_in_next_chunk(self):
+        self.gnss._parse_loc((_rmc(1) + _gga(1, 10) + _rmc(2)).encode())
+        self.assertEqual(self._fixes(), [(1, 10)])
+        self.gnss._parse_loc((_gga(2, 11) + _rmc(3) + _gga(3, 12)).encode())
+        self.assertEqual(self._fixes(), [(1, 10), (2, 11), (3, 12)])
+
+
+class _Locator:
+
+    def __init__(self, result, delay=0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    def read(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+class _FixSource:
+    """GNSS stand-in, `fixes` are returned by last_fix one per call, the last one is kept."""
+
+    def __init__(self, *fixes):
+        self.fixes = list(fixes)
+
+    def start(self):
+        return True
+
+    def last_fix(self):
+        return self.fixes.pop(0) if len(self.fixes) > 1 else self.fixes[0]
+
+
+class _Net:
+
+    @staticmethod
+    def getServingLac():
+        return 0x5A1
+
+    @staticmethod
+    def getServingCi():
+        return 0x1B2C3
+
+
+class TestLocationManager(unittest.TestCase):
+
+    def setUp(self):
+        self.net = location.net
+        location.net = _Net
+
+    def tearDown(self):
+        location.net = self.net
+
+    def test_gnss_fix_preferred(self):
+        fix = GNSSFix(0, 31.82, 117.11, 0.0, 0.0, 0.0, 0.8, 9)
+        cell = _Locator((117.1, 31.8, 600), delay=0.5)
+        manager = location.LocationManager(_FixSource(None, fix), cell=cell, gnss_timeout=2, cell_timeout=2)
+        start = time.time()
+        result = manager.read()
+        self.assertEqual(result, {"source": "gnss", "lng": 117.11, "lat": 31.82, "accuracy": 4.0, "cached": False})
+        # A fix better than the usual cell accuracy does not wait for the cell lookup.
+        self.assertLess(time.time() - start, 0.4)
+
+    def test_fallback_on_stale_gnss(self):
+        # The fix from before the read is not a new fix.
+        old = GNSSFix(0, 31.82, 117.11, 0.0, 0.0, 0.0, 0.8, 9)
+        wifi = _Locator((117.12, 31.83, 40))
+        cell = _Locator((117.1, 31.8, 600))
+        manager = location.LocationManager(_FixSource(old), wifi=wifi, cell=cell, gnss_timeout=0.3)
+        result = manager.read()
+        self.assertEqual(result, {"source": "wifi", "lng": 117.12, "lat": 31.83, "accuracy": 40, "cached": False})
+
+    def test_failed_locator(self):
+        manager = location.LocationManager(cell=_Locator(-1), cell_timeout=1)
+        self.assertIsNone(manager.read())
+
+    def test_cell_cache_and_age(self):
+        cell = _Locator((117.1, 31.8, 600))
+        manager = location.LocationManager(cell=cell, cache_ttl=0.3)
+        self.assertFalse(manager.read()["cached"])
+        self.assertTrue(manager.read()["cached"])
+        self.assertEqual(cell.calls, 1)
+        time.sleep(0.35)
+        self.assertFalse(manager.read()["cached"])
+        self.assertEqual(cell.calls, 2)
+        manager.clear_cache()
+        self.assertFalse(manager.read()["cached"])
+        self.assertEqual(cell.calls, 3)
+
+
+class _PowerGNSS:
+    """GNSS stand-in recording power calls, `pins` False models a receiver without standby / backup pins."""
+
+    def __init__(self, pins=True):
+        self.pins = pins
+        self.calls = []
+        self.callback = None
+
+    def subscribe(self, callback, hdop=None):
+        self.callback = callback
+        return 1
+
+    def unsubscribe(self, sid):
+        self.callback = None
+        return True
+
+    def start(self):
+        self.calls.append("start")
+        return True
+
+    def stop(self):
+        self.calls.append("stop")
+        return True
+
+    def standby(self, value):
+        self.calls.append(("standby", value))
+        return self.pins
+
+    def backup(self, value):
+        self.calls.append(("backup", value))
+        return self.pins
+
+
+class TestDutyCycle(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.utime = sys.modules["utime"]
+        self.ticks_ms = self.utime.ticks_ms
+        self.start_new_thread = location._thread.start_new_thread
+        self.utime.ticks_ms = lambda: self.now
+        # Steps are run by the test at the simulated time instead of the thread.
+        location._thread.start_new_thread = lambda func, args: None
+
+    def tearDown(self):
+        self.utime.ticks_ms = self.ticks_ms
+        location._thread.start_new_thread = self.start_new_thread
+
+    def _cycle(self, gnss, **kwargs):
+        duty = location.GNSSDutyCycle(gnss, **kwargs)
+        self.assertTrue(duty.start())
+        return duty, duty._GNSSDutyCycle__step
+
+    def _fix(self, gnss, speed=0.0):
+        gnss.callback(GNSSFix(0, 31.82, 117.11, speed, 0.0, 0.0, 0.9, 9))
+
+    def test_standby_and_wake(self):
+        gnss = _PowerGNSS()
+        duty, step = self._cycle(gnss, max_age=60)
+        self.now = 1000
+        step()
+        self.assertEqual(duty.state(), duty.CONTINUOUS)
+        self._fix(gnss)
+        step()
+        # Backup does not pay off within 60 s, standby until 5 s before the position is 60 s old.
+        self.assertEqual(duty.state(), duty.STANDBY)
+        self.assertEqual(gnss.calls[-1], ("standby", 1))
+        self.now = 55999
+        step()
+        self.assertEqual(duty.state(), duty.STANDBY)
+        self.now = 56000
+        step()
+        self.assertEqual(duty.state(), duty.CONTINUOUS)
+        self.assertEqual(gnss.calls[-2:], [("standby", 0), ("backup", 0)])
+        self.now = 59000
+        self._fix(gnss)
+        stats = duty.stats()
+        self.assertEqual(stats["wakes"], 1)
+        self.assertEqual(stats["reacquire"], [3000])
+        self.assertEqual(stats["reacquire_estimate"]["standby"], 4500)
+        self.assertEqual(stats["time"], {"continuous": 4, "standby": 55, "backup": 0})
+
+    def test_backup_only_when_still(self):
+        gnss = _PowerGNSS()
+        duty, step = self._cycle(gnss, max_age=600)
+        self._fix(gnss, speed=20.0)
+        step()
+        self.assertEqual(duty.state(), duty.STANDBY)
+        duty.stop()
+        self.assertEqual(duty.state(), duty.CONTINUOUS)
+        duty, step = self._cycle(gnss, max_age=600)
+        self._fix(gnss)
+        step()
+        self.assertEqual(duty.state(), duty.BACKUP)
+        self.assertEqual(gnss.calls[-1], ("backup", 1))
+
+    def test_acquire_timeout(self):
+        gnss = _PowerGNSS()
+        duty, step = self._cycle(gnss, max_age=60, acquire_timeout=120)
+        self.now = 119999
+        step()
+        self.assertEqual(duty.state(), duty.CONTINUOUS)
+        self.now = 120000
+        step()
+        self.assertEqual(duty.state(), duty.BACKUP)
+        self.assertEqual(duty.stats()["timeouts"], 1)
+        self.now = 180000
+        step()
+        self.assertEqual(duty.state(), duty.CONTINUOUS)
+
+    def test_stop_without_pins(self):
+        gnss = _PowerGNSS(pins=False)
+        duty, step = self._cycle(gnss, max_age=60)
+        self._fix(gnss)
+        step()
+        self.assertEqual(duty.state(), duty.STANDBY)
+        self.assertEqual(gnss.calls[-2:], [("standby", 1), "stop"])
+        self.now = 55000
+        step()
+        self.assertEqual(gnss.calls[-1], "start")
+
+
+class _I2C:
+    """Simulated I2C receiver, each read fills the buffer with the next chunk padded with 0x00."""
+
+    def __init__(self, gnss, chunks):
+        self.gnss = gnss
+        self.chunks = list(chunks)
+        self.kept = []
+
+    def read(self, slaveaddress, addr, addr_len, buf, size, delay):
+        before = self.gnss.read(2)
+        chunk = self.chunks.pop(0)
+        buf[:] = chunk + bytes(size - len(chunk))
+        # The nmea data kept by the previous reads must not change while a read is filled.
+        self.kept.append(self.gnss.read(2) == before)
+        if not self.chunks:
+            self.gnss._GNSSExternalI2C__running = 0
+
+
+class TestI2CBuffers(unittest.TestCase):
+
+    def test_padding_read_keeps_nmea(self):
+        rmc = RMC.encode()
+        gga = nmea_sentence("GNGGA,123457.000,3149.333008,N,11707.083336,E,1,9,1.30,98.483,M,-0.336,M,,").encode()
+        gnss = location.GNSSExternalI2C(1, 0, 0x10, 0, 0, None, None, None)
+        i2c = gnss._GNSSExternalI2C__gnss = _I2C(gnss, (rmc, b"", gga, b"", b"", rmc))
+        gnss._poll_interval = lambda: 0
+        gnss._GNSSExternalI2C__running = 1
+        gnss._receive()
+        self.assertEqual(i2c.kept, [True] * 6)
+        self.assertEqual(gnss.read(2), rmc)
+
+
+if __name__ == "__main__":
+    unittest.main()
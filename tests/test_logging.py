@@ -0,0 +1,439 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :test_logging.py
+@brief     :Host tests of logging.py.
+
+Usage:
+    pytest
+    python3 -m unittest discover -s tests
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+import host_env  # noqa: E402
+
+host_env.install()
+import logdecode  # noqa: E402
+from modules import logging  # noqa: E402
+
+
+class _PropertyClient:
+    """Client with a `status` property like TBDeviceMQTTClient and AliIot."""
+
+    def __init__(self):
+        self.online = False
+        self.sent = []
+
+    @property
+    def status(self):
+        return self.online
+
+    def send_telemetry(self, data):
+        self.sent.append(data)
+        return True
+
+
+class _Collector:
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, msg, level=logging.NOTSET, record=None):
+        self.lines.append(msg)
+
+
+class TestLogShipper(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_offline_property_client_spools(self):
+        client = _PropertyClient()
+        shipper = logging.LogShipper(client, spool=os.path.join(self.dir, "spool"))
+        shipper.write("[t][app][WARNING] offline", logging.WARNING)
+        self.assertFalse(shipper.ship())
+        self.assertEqual(client.sent, [])
+        self.assertEqual(shipper.stats()["spooled"], 1)
+        client.online = True
+        shipper.write("[t][app][WARNING] online", logging.WARNING)
+        self.assertTrue(shipper.ship())
+        self.assertEqual([p["log"] for p in client.sent], ["[t][app][WARNING] offline", "[t][app][WARNING] online"])
+
+
+class TestFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp() + "/"
+        self.handler = None
+
+    def tearDown(self):
+        if self.handler is not None:
+            self.handler.close()
+        shutil.rmtree(self.dir)
+
+    def _handler(self, size=0x10000, backups=1, buffer_size=64):
+        self.handler = logging.FileHandler(self.dir, "file.log", size, backups, buffer_size, period=0)
+        return self.handler
+
+    def _read(self, name="file.log.0"):
+        with open(self.dir + name) as f:
+            return f.read()
+
+    def test_buffered_until_full(self):
+        handler = self._handler()
+        handler.write("a" * 29)
+        handler.write("b" * 29)
+        self.assertEqual(self._read(), "")
+        # The third line does not fit, the first two are written in one write.
+        handler.write("c" * 29)
+        self.assertEqual(self._read(), "a" * 29 + "\n" + "b" * 29 + "\n")
+        handler.flush()
+        self.assertEqual(self._read().splitlines(), ["a" * 29, "b" * 29, "c" * 29])
+
+    def test_error_flushed_at_once(self):
+        handler = self._handler()
+        handler.write("info", logging.INFO)
+        self.assertEqual(self._read(), "")
+        handler.write("error", logging.ERROR)
+        self.assertEqual(self._read(), "info\nerror\n")
+
+    def test_line_over_buffer_size(self):
+        handler = self._handler(buffer_size=16)
+        handler.write("short")
+        handler.write("x" * 40)
+        self.assertEqual(self._read(), "short\n" + "x" * 40 + "\n")
+
+    def test_size_tracked_in_memory(self):
+        with open(self.dir + "file.log.0", "w") as f:
+            f.write("old\n")
+        calls = []
+        getsize = logging.ql_fs.path_getsize
+        logging.ql_fs.path_getsize = lambda path: calls.append(path) or getsize(path)
+        try:
+            handler = self._handler(size=100)
+            for i in range(20):
+                handler.write("line %02d" % i, logging.ERROR)
+        finally:
+            logging.ql_fs.path_getsize = getsize
+        # Only the existing segment is measured, when it is opened.
+        self.assertEqual(calls, [self.dir + "file.log.0"])
+        self.assertEqual(self._read().splitlines(), ["old"] + ["line %02d" % i for i in range(11)])
+        self.assertEqual(self._read("file.log.1").splitlines(), ["line %02d" % i for i in range(11, 20)])
+
+
+class TestSegments(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp() + "/"
+        self.handler = None
+
+    def tearDown(self):
+        if self.handler is not None:
+            self.handler.close()
+        shutil.rmtree(self.dir)
+
+    def _handler(self, size=40, backups=2):
+        self.handler = logging.FileHandler(self.dir, "seg.log", size, backups, 0x100, period=0)
+        return self.handler
+
+    def _touch(self, name, data=""):
+        with open(self.dir + name, "w") as f:
+            f.write(data)
+
+    def _lines(self, name):
+        with open(self.dir + name) as f:
+            return f.read().splitlines()
+
+    def test_rotation_ring(self):
+        handler = self._handler(size=20, backups=2)
+        for i in range(7):
+            handler.write("line %d" % i)
+        handler.flush()
+        # Two 7 byte lines fill a segment, line 6 wraps around and truncates seg.log.0.
+        self.assertEqual(self._lines("seg.log.0"), ["line 6"])
+        self.assertEqual(self._lines("seg.log.1"), ["line 2", "line 3"])
+        self.assertEqual(self._lines("seg.log.2"), ["line 4", "line 5"])
+        self.assertEqual(self._lines("seg.log.idx"), ["0"])
+        self.assertEqual(handler.segments(), [self.dir + "seg.log.1", self.dir + "seg.log.2", self.dir + "seg.log.0"])
+        self.assertEqual(list(handler.lines()), ["line %d" % i for i in range(2, 7)])
+
+    def test_manifest_restored(self):
+        handler = self._handler(size=20, backups=2)
+        for i in range(3):
+            handler.write("line %d" % i)
+        handler.close()
+        self.assertEqual(self._lines("seg.log.idx"), ["1"])
+        # A new handler appends to the segment named by the manifest and keeps its size.
+        handler = self._handler(size=20, backups=2)
+        handler.write("line 3")
+        handler.write("line 4")
+        handler.flush()
+        self.assertEqual(self._lines("seg.log.1"), ["line 2", "line 3"])
+        self.assertEqual(self._lines("seg.log.2"), ["line 4"])
+        self.assertEqual(list(handler.lines()), ["line %d" % i for i in range(5)])
+
+    def test_manifest_out_of_range(self):
+        self._touch("seg.log.idx", "7")
+        handler = self._handler(backups=2)
+        handler.write("line")
+        handler.flush()
+        self.assertEqual(handler.segments(), [self.dir + "seg.log.0"])
+
+    def test_record_not_split(self):
+        handler = self._handler(size=20, backups=1)
+        handler.write("short")
+        handler.write("x" * 30)
+        handler.flush()
+        self.assertEqual(self._lines("seg.log.0"), ["short"])
+        self.assertEqual(self._lines("seg.log.1"), ["x" * 30])
+
+    def test_old_format_removed(self):
+        for name in ("seg.log", "seg.log.1", "seg.log.2", "seg.log.3", "other.log"):
+            self._touch(name, "old\n")
+        self._handler().write("new")
+        self.assertEqual(sorted(os.listdir(self.dir)), ["other.log", "seg.log.0"])
+
+    def test_old_format_kept_with_manifest(self):
+        self._touch("seg.log", "old\n")
+        self._touch("seg.log.1", "segment\n")
+        self._touch("seg.log.idx", "1")
+        self._handler().write("new")
+        self.assertEqual(sorted(os.listdir(self.dir)), ["seg.log", "seg.log.1", "seg.log.idx"])
+
+    def test_rollover_opens_one_file(self):
+        handler = self._handler(size=20)
+        handler.write("first line", logging.ERROR)
+        handler.write("second line", logging.ERROR)
+        opened = []
+        logging.open = lambda path, *args: opened.append(path) or open(path, *args)
+        try:
+            handler.write("third line", logging.ERROR)
+        finally:
+            del logging.open
+        self.assertEqual(opened, [self.dir + "seg.log.2"])
+        with open(self.dir + "seg.log.idx") as f:
+            self.assertEqual(f.read(), "2")
+
+
+class TestAsyncLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        logging.setLogAsync(False)
+        logging.setSaveLog(False)
+        shutil.rmtree(self.dir)
+
+    def _queue(self, size, levels):
+        """Queue records of levels behind a first record held by the writer, return output messages and drops."""
+        collector = _Collector()
+        logging.addLogHandler(collector)
+        policy = {logging.DEBUG: "newest", logging.WARNING: "oldest", logging.ERROR: "oldest"}
+        try:
+            with logging._LOG_LOCK:
+                writer = logging._AsyncWriter(size, policy)
+                writer.put((0, "mixed", logging.ERROR, ("first",)))
+                # The writer takes the first record and waits for the lock.
+                for _ in range(100):
+                    if not writer._AsyncWriter__count:
+                        break
+                    time.sleep(0.01)
+                for i, level in enumerate(levels):
+                    writer.put((0, "mixed", level, ("%d" % i,)))
+            writer.stop()
+        finally:
+            logging.removeLogHandler(collector)
+        return [line.split("] ", 1)[1] for line in collector.lines[1:]], writer.drops()
+
+    def test_oldest_policy_keeps_severe_records(self):
+        lines, drops = self._queue(3, (logging.ERROR, logging.WARNING, logging.WARNING, logging.WARNING, logging.DEBUG))
+        self.assertEqual(lines, ["0", "2", "3"])
+        self.assertEqual(drops, {"WARNING": 1, "DEBUG": 1})
+
+    def test_oldest_policy_drops_new_below_queue(self):
+        lines, drops = self._queue(2, (logging.ERROR, logging.ERROR, logging.WARNING, logging.ERROR))
+        self.assertEqual(lines, ["1", "3"])
+        self.assertEqual(drops, {"WARNING": 1, "ERROR": 1})
+
+    def test_close_after_queued_records(self):
+        log = logging.getLogger("async")
+        self.assertTrue(logging.setSaveLog(True, self.dir, "async.log", 0x10000, 1))
+        self.assertTrue(logging.setLogAsync(True, 256))
+        for i in range(200):
+            log.info("record %d", i)
+        logging.setSaveLog(False)
+        logging.setLogAsync(False)
+        with open(os.path.join(self.dir, "async.log.0")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.split("] ", 1)[1] for line in lines], ["record %d" % i for i in range(200)])
+        self.assertEqual(os.listdir(self.dir), ["async.log.0"])
+
+
+class TestReadLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        logging.setSaveLog(False)
+        shutil.rmtree(self.dir)
+
+    def test_text(self):
+        logging.setSaveLog(True, self.dir, "binary.log", 0x10000, 1, binary=True)
+        logging.setSaveLog(True, self.dir, "text.log", 0x10000, 1)
+        logging.getLogger("read").info("state: %s", 1)
+        self.assertEqual([line.split("] ", 1)[1] for line in logging.readLog()], ["state: 1"])
+
+    def test_binary_refused(self):
+        logging.setSaveLog(True, self.dir, "binary.log", 0x10000, 1, binary=True)
+        logging.getLogger("read").info("state: %s", 1)
+        self.assertRaises(ValueError, logging.readLog)
+        logging.setSaveLog(False)
+        self.assertRaises(ValueError, logging.readLog)
+
+
+class TestBinaryLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        logging.setSaveLog(False)
+        shutil.rmtree(self.dir)
+
+    def test_dynamic_text_inline(self):
+        log = logging.getLogger("binary")
+        logging.setSaveLog(True, self.dir, "binary.log", 0x10000, 1, binary=True)
+        for i in range(20):
+            log.info("value " + str(i))
+            log.info("state: %s", i)
+        log.info("count", 7)
+        logging.setSaveLog(False)
+        base = os.path.join(self.dir, "binary.log")
+        templates, names, offset = logdecode.load_dict(base + ".dict")
+        self.assertEqual(sorted(templates), ["%s", "%s %s", "state: %s"])
+        decoder = logdecode.Decoder(templates, names, offset)
+        with open(base + ".0", "rb") as f:
+            lines = [line.split("] ", 1)[1] for line in decoder.decode(f.read())]
+        expected = []
+        for i in range(20):
+            expected += ["value %d" % i, "state: %d" % i]
+        self.assertEqual(lines, expected + ["count 7"])
+
+
+class TestCrashLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "crash.log")
+        self.ticks_ms = logging.utime.ticks_ms
+        self.now = 0
+        logging.utime.ticks_ms = lambda: self.now
+
+    def tearDown(self):
+        logging.utime.ticks_ms = self.ticks_ms
+        logging.setCrashLog(0)
+        logging.setLogLevel("debug")
+        shutil.rmtree(self.dir)
+
+    def _read(self):
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_ring_keeps_filtered_records(self):
+        log = logging.getLogger("crash")
+        self.assertTrue(logging.setCrashLog(3, self.path))
+        logging.setLogLevel("error")
+        for i in range(5):
+            log.debug("record %d", i)
+        self.assertEqual(logging.dumpCrashLog(), 3)
+        lines = self._read()
+        self.assertTrue(lines[0].startswith("==== crash log "))
+        self.assertEqual([line.split("] ", 1)[1] for line in lines[1:]], ["record 2", "record 3", "record 4"])
+        self.assertTrue(all("[crash][DEBUG]" in line for line in lines[1:]))
+
+    def test_traceback_appended(self):
+        log = logging.getLogger("crash")
+        self.assertTrue(logging.setCrashLog(4, self.path, hook=False))
+        log.info("before")
+        try:
+            raise ValueError("broken")
+        except ValueError as e:
+            self.assertEqual(logging.dumpCrashLog(e), 1)
+        lines = self._read()
+        self.assertTrue(lines[1].endswith("[crash][INFO] before"))
+        self.assertEqual(lines[-1], "ValueError: broken")
+
+    def test_hook_dump_interval(self):
+        log = logging.getLogger("crash")
+        self.assertTrue(logging.setCrashLog(4, self.path, interval=60))
+        log.info("first")
+        sys.print_exception(ValueError("first"), io.StringIO())
+        self.assertEqual(self._read()[-1], "ValueError: first")
+        # Within the interval and with nothing logged since, the file is kept.
+        log.info("second")
+        self.now = 59000
+        sys.print_exception(ValueError("second"), io.StringIO())
+        self.assertEqual(self._read()[-1], "ValueError: first")
+        self.now = 60000
+        sys.print_exception(ValueError("third"), io.StringIO())
+        self.assertEqual(self._read()[-1], "ValueError: third")
+        sys.print_exception(ValueError("fourth"), io.StringIO())
+        self.assertEqual(self._read()[-1], "ValueError: third")
+
+    def test_disabled(self):
+        self.assertFalse(logging.setCrashLog(-1))
+        self.assertTrue(logging.setCrashLog(0, self.path))
+        self.assertEqual(logging.dumpCrashLog(), -1)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestSuppress(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = _Collector()
+        logging.addLogHandler(self.collector)
+
+    def tearDown(self):
+        logging.setLogSuppress()
+        logging.removeLogHandler(self.collector)
+
+    def test_flush_rate_limited_count(self):
+        log = logging.getLogger("limited")
+        self.assertTrue(logging.setLogSuppress(rate=0.001, burst=1))
+        for i in range(5):
+            log.info("record %d", i)
+        self.assertEqual(len(self.collector.lines), 1)
+        logging.flushLog()
+        self.assertEqual(len(self.collector.lines), 2)
+        self.assertTrue(self.collector.lines[1].endswith("[limited][INFO] 4 messages suppressed by rate limit"))
+        logging.flushLog()
+        self.assertEqual(len(self.collector.lines), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :test_serial.py
+@brief     :Host tests of serial.py with a simulated UART.
+
+Usage:
+    pytest
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+import host_env  # noqa: E402
+
+host_env.install()
+
+
+class _UART:
+    """Simulated UART, `on_read` runs inside `read` to model bytes arriving during the copy."""
+    UART2 = 2
+
+    def __init__(self, *args):
+        self.rx = bytearray()
+        self.callback = None
+        self.on_read = None
+        self.lock = threading.Lock()
+
+    def set_callback(self, callback):
+        self.callback = callback
+
+    def any(self):
+        with self.lock:
+            return len(self.rx)
+
+    def read(self, size):
+        with self.lock:
+            data = bytes(self.rx[:size])
+            del self.rx[:size]
+        on_read, self.on_read = self.on_read, None
+        if on_read is not None:
+            on_read()
+        return data
+
+    def write(self, data):
+        return len(data)
+
+    def feed(self, data):
+        with self.lock:
+            self.rx += data
+        self.callback(None)
+
+
+class _Timer:
+    Timer1 = 1
+    ONE_SHOT = 0
+
+    def __init__(self, *args):
+        self.timer = None
+
+    def start(self, period, mode, callback):
+        self.timer = threading.Timer(period / 1000, callback, (None,))
+        self.timer.start()
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.cancel()
+
+
+sys.modules["machine"].UART = _UART
+sys.modules["machine"].Timer = _Timer
+from modules.serial import Serial, LineFramer, SlipFramer, CobsFramer, LengthFramer, crc16  # noqa: E402
+
+
+class TestSerialRead(unittest.TestCase):
+
+    def test_second_chunk_during_copy(self):
+        serial = Serial()
+        uart = serial._Serial__uart
+        uart.on_read = lambda: uart.feed(bytes(range(50, 100)))
+        uart.feed(bytes(range(50)))
+        start = time.time()
+        data = serial.read(100, 2000)
+        self.assertEqual(data, bytes(range(100)))
+        self.assertLess(time.time() - start, 1)
+
+    def test_second_chunk_later(self):
+        serial = Serial()
+        uart = serial._Serial__uart
+        uart.feed(b"a" * 50)
+        threading.Timer(0.05, uart.feed, (b"b" * 50,)).start()
+        self.assertEqual(serial.read(100, 2000), b"a" * 50 + b"b" * 50)
+
+    def test_timeout_returns_partial(self):
+        serial = Serial()
+        serial._Serial__uart.feed(b"abc")
+        buf = bytearray(10)
+        self.assertEqual(serial.readinto(buf, 100), 3)
+        self.assertEqual(bytes(buf[:3]), b"abc")
+
+
+def _length_frame(payload):
+    crc = crc16(payload)
+    return bytes((len(payload) >> 8, len(payload) & 0xFF)) + payload + bytes((crc >> 8, crc & 0xFF))
+
+
+class TestFrameSize(unittest.TestCase):
+
+    def test_framer_larger_than_buffer(self):
+        serial = Serial()
+        self.assertRaises(ValueError, serial.read_frame, LengthFramer(max_size=1024))
+
+    def test_large_frame_in_rx_buffer(self):
+        serial = Serial(rx_size=1024)
+        payload = bytes(range(256)) * 2 + bytes(100)
+        serial._Serial__uart.feed(_length_frame(payload))
+        self.assertEqual(bytes(serial.read_frame(LengthFramer(max_size=1000))), payload)
+
+    def test_default_framer_fits(self):
+        serial = Serial()
+        serial._Serial__uart.feed(_length_frame(b"x" * 256))
+        self.assertEqual(bytes(serial.read_frame(LengthFramer())), b"x" * 256)
+
+
+def _cobs(payload):
+    out = bytearray()
+    block = bytearray()
+    for byte in payload:
+        if byte:
+            block.append(byte)
+        if not byte or len(block) == 0xFE:
+            out += bytes((len(block) + 1,)) + block
+            block = bytearray()
+    return bytes(out + bytes((len(block) + 1,)) + block + b"\x00")
+
+
+class TestFramers(unittest.TestCase):
+
+    def _frames(self, framer, data):
+        serial = Serial()
+        serial._Serial__uart.feed(data)
+        return [bytes(frame) for frame in serial.frames(framer)]
+
+    def test_line(self):
+        framer = LineFramer(b"\r\n", max_size=8)
+        self.assertEqual(self._frames(framer, b"one\r\n\r\ntwo\r\n"), [b"one", b"", b"two"])
+
+    def test_line_over_max_size(self):
+        framer = LineFramer(max_size=8)
+        data = b"short\n" + b"x" * 20 + b"\nnext\n"
+        self.assertEqual(self._frames(framer, data), [b"short", b"next"])
+
+    def test_slip(self):
+        data = b"\xc0\xc0a\xdb\xdcb\xdb\xddc\xc0plain\xc0"
+        self.assertEqual(self._frames(SlipFramer(), data), [b"a\xc0b\xdbc", b"plain"])
+
+    def test_cobs(self):
+        payloads = [b"\x11\x00\x00\x22", b"\x00", bytes(range(1, 256)) + b"\x00\x01"]
+        self.assertEqual(_cobs(payloads[0]), b"\x02\x11\x01\x02\x22\x00")
+        data = b"".join(_cobs(payload) for payload in payloads)
+        self.assertEqual(self._frames(CobsFramer(), data), payloads)
+
+    def test_cobs_bad_code(self):
+        # The code 0x05 points past the delimiter, the frame is dropped.
+        data = b"\x05ab\x00" + _cobs(b"ok")
+        self.assertEqual(self._frames(CobsFramer(), data), [b"ok"])
+
+    def test_length(self):
+        payloads = [b"", b"one", b"\x00" * 64]
+        data = b"".join(_length_frame(payload) for payload in payloads)
+        self.assertEqual(self._frames(LengthFramer(max_size=64), data), payloads)
+
+    def test_length_bad_crc(self):
+        bad = bytearray(_length_frame(b"damaged"))
+        bad[-1] ^= 0xFF
+        data = bytes(bad) + _length_frame(b"good")
+        self.assertEqual(self._frames(LengthFramer(max_size=64), data), [b"good"])
+
+    def test_length_oversize(self):
+        data = _length_frame(b"y" * 65) + _length_frame(b"fits")
+        self.assertEqual(self._frames(LengthFramer(max_size=64), data), [b"fits"])
+
+    def test_length_without_crc(self):
+        framer = LengthFramer(size=1, crc=False, max_size=16)
+        self.assertEqual(framer.max_frame, 17)
+        self.assertEqual(self._frames(framer, b"\x03abc\x00\x02de"), [b"abc", b"", b"de"])
+
+    def test_partial_frame_waits(self):
+        serial = Serial()
+        uart = serial._Serial__uart
+        frame = _length_frame(b"split")
+        uart.feed(frame[:4])
+        self.assertIsNone(serial.read_frame(LengthFramer()))
+        threading.Timer(0.05, uart.feed, (frame[4:],)).start()
+        self.assertEqual(bytes(serial.read_frame(LengthFramer(), 2000)), b"split")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -80,7 +80,7 @@ class TBDeviceMQTTClient:
     def status(self):
         return self.__status
         state = self.__mqtt.get_mqttsta() if self.__mqtt else -1
-        log.debug("mqtt state: %s" % state)
+        log.debug("mqtt state: %s", state)
         return True if state == 0 else False
 
     def set_callback(self, callback):
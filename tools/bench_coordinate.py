@@ -0,0 +1,84 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :bench_coordinate.py
+@brief     :Host benchmark of location.CoordinateSystemConvert.
+
+Usage:
+    python3 tools/bench_coordinate.py [points]
+"""
+
+import sys
+import math
+import time
+import random
+from array import array
+
+import host_env
+
+host_env.install()
+from modules.location import CoordinateSystemConvert  # noqa: E402
+
+
+def legacy_wgs84_to_gcj02(csc, lon, lat):
+    """Single point conversion before batch conversion was added."""
+    d_lat = csc._transformLat(lon - 105.0, lat - 35.0)
+    d_lon = csc._transformLon(lon - 105.0, lat - 35.0)
+    rad_lat = lat / 180.0 * math.pi
+    magic = math.sin(rad_lat)
+    magic = 1 - magic * magic * csc.EE
+    sqrt_magic = math.sqrt(magic)
+    d_lat = (d_lat * 180.0) / ((csc.EARTH_RADIUS * 1000 * (1 - csc.EE)) / (magic * sqrt_magic) * math.pi)
+    d_lon = (d_lon * 180.0) / (csc.EARTH_RADIUS * 1000 / sqrt_magic * math.cos(rad_lat) * math.pi)
+    return lon + d_lon, lat + d_lat
+
+
+def timeit(name, count, func):
+    start = time.perf_counter()
+    res = func()
+    used = time.perf_counter() - start
+    print("%-28s %8.1f ms %8.2f us/point" % (name, used * 1000, used * 1000000 / count))
+    return res
+
+
+def main(count):
+    random.seed(0)
+    csc = CoordinateSystemConvert()
+    # A random walk track in China.
+    lons, lats = array("d"), array("d")
+    lon, lat = 117.1154, 31.8222
+    for _ in range(count):
+        lon += random.uniform(-0.0005, 0.0005)
+        lat += random.uniform(-0.0005, 0.0005)
+        lons.append(lon)
+        lats.append(lat)
+
+    print("points: %d" % count)
+    legacy = timeit("legacy per point", count, lambda: [legacy_wgs84_to_gcj02(csc, lons[i], lats[i]) for i in range(count)])
+    timeit("wgs84_to_gcj02 per point", count, lambda: [csc.wgs84_to_gcj02(lons[i], lats[i]) for i in range(count)])
+    g_lons, g_lats = timeit("wgs84_to_gcj02_batch", count, lambda: csc.wgs84_to_gcj02_batch(lons, lats))
+    w_lons, w_lats = timeit("gcj02_to_wgs84_batch", count, lambda: csc.gcj02_to_wgs84_batch(g_lons, g_lats))
+    timeit("distance per segment", count, lambda: [csc.distance(lons[i], lats[i], lons[i + 1], lats[i + 1]) for i in range(count - 1)])
+    dist, _ = timeit("distance_batch", count, lambda: csc.distance_batch(lons, lats))
+
+    diff = max(max(abs(legacy[i][0] - g_lons[i]), abs(legacy[i][1] - g_lats[i])) for i in range(count))
+    err = max(max(abs(w_lons[i] - lons[i]), abs(w_lats[i] - lats[i])) for i in range(count))
+    print("batch vs legacy max diff: %.3e degree" % diff)
+    print("inverse round trip max error: %.3e degree" % err)
+    print("track length: %.1f m" % sum(dist))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,100 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :bench_geofence.py
+@brief     :Host benchmark of geofence.GeoFence against a linear scan of all fences.
+
+Usage:
+    python3 tools/bench_geofence.py [fences] [fixes]
+"""
+
+import sys
+import math
+import time
+import random
+
+import host_env
+
+host_env.install()
+from modules.geofence import GeoFence  # noqa: E402
+from modules.location import GNSSFix  # noqa: E402
+
+M_PER_DEG = 6371008.8 * math.pi / 180.0
+
+
+def in_polygon(points, lat, lng):
+    inside = False
+    j = len(points) - 1
+    for i in range(len(points)):
+        (yi, xi), (yj, xj) = points[i], points[j]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def in_circle(circle, lat, lng):
+    c_lat, c_lng, radius = circle
+    dy = (lat - c_lat) * M_PER_DEG
+    dx = (lng - c_lng) * M_PER_DEG * math.cos(math.radians(c_lat))
+    return dx * dx + dy * dy <= radius * radius
+
+
+def main(count, fixes_count):
+    random.seed(0)
+    lat0, lng0 = 31.8222, 117.1154
+    fence = GeoFence(cell_size=0.01)
+    linear = []
+    for i in range(count):
+        lat, lng = lat0 + random.uniform(-0.5, 0.5), lng0 + random.uniform(-0.5, 0.5)
+        if i % 2:
+            radius = random.uniform(50, 1000)
+            fence.add_circle(i, lat, lng, radius)
+            linear.append((i, in_circle, (lat, lng, radius)))
+        else:
+            size = random.uniform(0.001, 0.01)
+            points = []
+            for k in range(random.randint(3, 12)):
+                a = 2 * math.pi * k / 12
+                r = size * random.uniform(0.5, 1.0)
+                points.append((lat + r * math.sin(a), lng + r * math.cos(a)))
+            fence.add_polygon(i, points)
+            linear.append((i, in_polygon, points))
+
+    fixes = []
+    lat, lng = lat0, lng0
+    for t in range(fixes_count):
+        lat += random.uniform(-0.002, 0.002)
+        lng += random.uniform(-0.002, 0.002)
+        fixes.append(GNSSFix(t, lat, lng, 0.0, 0.0, 0.0, 1.0, 10))
+
+    start = time.perf_counter()
+    expect = [[fid for fid, test, shape in linear if test(shape, fix.lat, fix.lng)] for fix in fixes]
+    linear_used = time.perf_counter() - start
+
+    start = time.perf_counter()
+    events = 0
+    for fix in fixes:
+        events += len(fence.on_fix(fix))
+    index_used = time.perf_counter() - start
+
+    mismatch = sum(1 for fix, ids in zip(fixes, expect) if sorted(fence.check(fix.lat, fix.lng)) != sorted(ids))
+    print("fences: %d, fixes: %d, events: %d, mismatches: %d" % (count, fixes_count, events, mismatch))
+    print("linear scan %10.1f us/fix" % (linear_used * 1000000 / fixes_count))
+    print("grid index  %10.1f us/fix" % (index_used * 1000000 / fixes_count))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
@@ -0,0 +1,135 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :bench_trajectory.py
+@brief     :Host benchmark of trajectory.TrackCompressor.
+
+Fixes come from an NMEA recording parsed by location.GNSSBase, or from a synthetic drive
+with turns, stops and receiver noise when no file is given.
+
+Usage:
+    python3 tools/bench_trajectory.py [nmea_file] [--tolerance 5,10,20] [--max-interval 0]
+"""
+
+import sys
+import math
+import time
+import random
+
+import host_env
+
+host_env.install()
+from modules.location import GNSSBase, GNSSFix  # noqa: E402
+from modules.trajectory import TrackCompressor  # noqa: E402
+
+M_PER_DEG = 6371008.8 * math.pi / 180.0
+
+
+def load_nmea(path):
+    fixes = []
+    gnss = GNSSBase()
+    gnss.subscribe(fixes.append)
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(1024)
+            if not data:
+                break
+            gnss._parse_loc(data)
+    return fixes
+
+
+def synthetic(count):
+    random.seed(0)
+    fixes = []
+    lat, lng = 31.8222, 117.1154
+    course, speed = 0.0, 40.0
+    for i in range(count):
+        if i % 600 < 60:
+            speed = 0.0
+        elif i % 120 == 0:
+            course = (course + random.choice((-90, 90, 30, -30))) % 360
+            speed = random.uniform(20, 80)
+        step = speed / 3.6
+        lat += step * math.cos(math.radians(course)) / M_PER_DEG
+        lng += step * math.sin(math.radians(course)) / (M_PER_DEG * math.cos(math.radians(lat)))
+        noise_lat = random.gauss(0, 2.0) / M_PER_DEG
+        noise_lng = random.gauss(0, 2.0) / (M_PER_DEG * math.cos(math.radians(lat)))
+        fixes.append(GNSSFix(i, lat + noise_lat, lng + noise_lng, speed, course, 0.0, 1.0, 10))
+    return fixes
+
+
+def segment_error(fix, a, b):
+    """Distance of fix from segment a-b in metres, local projection at a."""
+    cos_lat = math.cos(math.radians(a.lat))
+    px, py = (fix.lng - a.lng) * M_PER_DEG * cos_lat, (fix.lat - a.lat) * M_PER_DEG
+    bx, by = (b.lng - a.lng) * M_PER_DEG * cos_lat, (b.lat - a.lat) * M_PER_DEG
+    length = bx * bx + by * by
+    t = 0.0 if length == 0 else max(0.0, min(1.0, (px * bx + py * by) / length))
+    return math.hypot(px - t * bx, py - t * by)
+
+
+def run(fixes, tolerance, max_interval):
+    compressor = TrackCompressor(tolerance, max_interval)
+    kept = []
+    start = time.perf_counter()
+    for fix in fixes:
+        point = compressor.push(fix)
+        if point is not None:
+            kept.append(point)
+    point = compressor.flush()
+    if point is not None:
+        kept.append(point)
+    used = time.perf_counter() - start
+
+    errors = []
+    seg = 0
+    for fix in fixes:
+        while seg < len(kept) - 2 and fix.time > kept[seg + 1].time:
+            seg += 1
+        b = kept[seg + 1] if seg + 1 < len(kept) else kept[seg]
+        errors.append(segment_error(fix, kept[seg], b))
+    print("%9.1f %12.1f %8d %8.1f %10.2f %10.2f %10.2f" % (
+        tolerance, max_interval, len(kept), len(fixes) / len(kept),
+        max(errors), sum(errors) / len(errors), used * 1000000 / len(fixes)))
+
+
+def main(argv):
+    tolerances = [5.0, 10.0, 20.0, 50.0]
+    max_interval = 0
+    path = None
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--tolerance":
+            tolerances = [float(v) for v in argv[i + 1].split(",")]
+            i += 1
+        elif argv[i] == "--max-interval":
+            max_interval = int(argv[i + 1])
+            i += 1
+        else:
+            path = argv[i]
+        i += 1
+
+    fixes = load_nmea(path) if path else synthetic(20000)
+    if len(fixes) < 2:
+        print("not enough fixes: %d" % len(fixes))
+        return
+    print("fixes: %d (%s)" % (len(fixes), path or "synthetic"))
+    print("%9s %12s %8s %8s %10s %10s %10s" % ("tol(m)", "interval(s)", "kept", "ratio", "max(m)", "mean(m)", "us/fix"))
+    for tolerance in tolerances:
+        run(fixes, tolerance, max_interval)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,125 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :host_env.py
+@brief     :Stand-ins of QuecPython built-in modules for running the modules on a Linux host.
+
+Only what the modules touch at import time and in the host tools is provided, hardware classes do nothing.
+
+Usage:
+    import host_env
+    host_env.install()
+    from modules.location import NMEAParse
+"""
+
+import os
+import re
+import sys
+import io
+import json
+import time
+import struct
+import binascii
+import _thread
+import types
+import collections
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Hardware:
+    """Stand-in of machine.UART / Pin / I2C / Timer."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: 0
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _touch(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return 0
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def install():
+    """Register the stand-in modules and the `modules` package.
+
+    Returns:
+        str: repository root, which is the path of the `modules` package.
+    """
+    if "modules" in sys.modules:
+        return ROOT
+    _module(
+        "utime",
+        sleep=time.sleep,
+        sleep_ms=lambda ms: time.sleep(ms / 1000),
+        sleep_us=lambda us: time.sleep(us / 1000000),
+        ticks_ms=lambda: int(time.monotonic() * 1000),
+        ticks_us=lambda: int(time.monotonic() * 1000000),
+        ticks_diff=lambda new, old: new - old,
+        ticks_add=lambda ticks, delta: ticks + delta,
+        time=lambda: int(time.time()),
+        localtime=lambda secs=None: time.gmtime(secs)[:8],
+        mktime=lambda t: int(time.mktime(tuple(t[:6]) + (0, 0, 0)) - time.timezone),
+    )
+    sys.modules["ure"] = re
+    sys.modules["uos"] = os
+    sys.modules["usys"] = sys
+    sys.modules["ujson"] = json
+    sys.modules["ucollections"] = collections
+    sys.modules["ustruct"] = struct
+    sys.modules["uio"] = io
+    sys.modules["ubinascii"] = binascii
+    # QuecPython thread stacks are far smaller than the host minimum, keep the host default.
+    _module(
+        "_thread",
+        **dict(
+            _thread.__dict__,
+            stack_size=lambda size=0: _thread.stack_size(),
+            threadIsRunning=lambda tid: False,
+        )
+    )
+    _module("machine", UART=_Hardware, Pin=_Hardware, I2C=_Hardware, Timer=_Hardware)
+    _module(
+        "ql_fs",
+        path_exists=os.path.exists,
+        path_getsize=os.path.getsize,
+        touch=_touch,
+        read_json=_read_json,
+        mkdirs=lambda path: os.makedirs(path, exist_ok=True),
+    )
+    if not hasattr(sys, "print_exception"):
+        import traceback
+        sys.print_exception = lambda e, file=None: traceback.print_exception(type(e), e, e.__traceback__, file=file)
+    package = _module("modules")
+    package.__path__ = [ROOT]
+    return ROOT
@@ -0,0 +1,202 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :logdecode.py
+@brief     :Convert binary log files of logging.setSaveLog(binary=True) back to text on a host.
+
+The record format is described in logging._BinaryEncoder. Files are decoded in the given order, a single
+`<name>` argument is the log file name and takes its segments `<name>.0` ... `<name>.N` oldest first by the
+manifest `<name>.idx`. The dictionary is `<name>.dict` unless given with `--dict`. The output lines are the
+text format of the device.
+
+Usage:
+    python3 tools/logdecode.py <file> [<file> ...] [--dict <file>] [--stats]
+"""
+
+import os
+import sys
+import time
+import struct
+import calendar
+
+_LEVELS = {0: "NOTSET", 1: "DEBUG", 2: "INFO", 3: "WARNING", 4: "ERROR", 5: "CRITICAL"}
+
+
+def _unescape(text):
+    out = []
+    i = 0
+    while i < len(text):
+        if text[i] == "\\" and i + 1 < len(text):
+            out.append("\n" if text[i + 1] == "n" else text[i + 1])
+            i += 2
+        else:
+            out.append(text[i])
+            i += 1
+    return "".join(out)
+
+
+def load_dict(path):
+    """Load the dictionary, returns (templates, names, epoch offset in seconds)."""
+    templates, names, offset = [], [], 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("t "):
+                templates.append(_unescape(line[2:]))
+            elif line.startswith("n "):
+                names.append(_unescape(line[2:]))
+            elif line.startswith("e "):
+                offset = calendar.timegm(tuple(int(v) for v in line[2:].split()) + (0, 0, 0))
+    return templates, names, offset
+
+
+def _format(template, args):
+    # Same as logging._format with the template as first argument.
+    if not args or "%" in template:
+        try:
+            return template % args
+        except (TypeError, ValueError):
+            pass
+    return " ".join(str(m) for m in (template,) + args)
+
+
+class Decoder:
+    """Decode records of one log file set with its dictionary."""
+
+    def __init__(self, templates, names, offset):
+        self.templates = templates
+        self.names = names
+        self.offset = offset
+        self.last = None
+        self.records = 0
+        self.size = 0
+
+    @staticmethod
+    def _varint(data, pos):
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    def _arg(self, data, pos):
+        tag = data[pos]
+        pos += 1
+        if tag == 0:
+            return None, pos
+        if tag == 1:
+            value, pos = self._varint(data, pos)
+            return (value >> 1) if not value & 1 else -((value + 1) >> 1), pos
+        if tag == 2:
+            return struct.unpack_from("<d", data, pos)[0], pos + 8
+        if tag in (3, 4):
+            size, pos = self._varint(data, pos)
+            raw = bytes(data[pos:pos + size])
+            if len(raw) != size:
+                raise IndexError
+            return (raw.decode("utf-8", "replace") if tag == 3 else raw), pos + size
+        if tag in (5, 6):
+            return tag == 5, pos
+        raise ValueError("unknown argument tag %d" % tag)
+
+    def decode(self, data):
+        """Yield text lines of a file, stops at a truncated record."""
+        pos = 0
+        self.last = None
+        while pos < len(data):
+            start = pos
+            try:
+                head = data[pos]
+                pos += 1
+                delta, pos = self._varint(data, pos)
+                if head & 0x08:
+                    self.last = delta
+                elif self.last is not None:
+                    self.last += delta
+                name, pos = self._varint(data, pos)
+                template, pos = self._varint(data, pos)
+                args = []
+                for _ in range(head >> 4):
+                    arg, pos = self._arg(data, pos)
+                    args.append(arg)
+            except (IndexError, struct.error):
+                sys.stderr.write("truncated record at offset %d\n" % start)
+                return
+            self.records += 1
+            self.size += pos - start
+            if self.last is None:
+                stamp = "????-??-?? ??:??:??"
+            else:
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self.last + self.offset))
+            name = self.names[name] if name < len(self.names) else "#%d" % name
+            line = "[{}][{}][{}]".format(stamp, name, _LEVELS.get(head & 0x07, "NOTSET"))
+            if template < len(self.templates):
+                text = _format(self.templates[template], tuple(args))
+            else:
+                text = " ".join(["#%d" % template] + [str(a) for a in args])
+            yield line + " " + text if text else line
+
+
+def _files(paths):
+    if len(paths) != 1 or os.path.isfile(paths[0]):
+        return paths
+    base = paths[0]
+    count = 0
+    while os.path.exists("%s.%d" % (base, count)):
+        count += 1
+    index = count - 1
+    if os.path.exists(base + ".idx"):
+        with open(base + ".idx") as f:
+            index = int(f.read())
+        count = max(count, index + 1)
+    segments = ["%s.%d" % (base, (index + i) % count) for i in range(1, count + 1)] if count else []
+    return [path for path in segments if os.path.exists(path)]
+
+
+def main(argv):
+    paths = []
+    dict_path = None
+    stats = False
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--dict":
+            dict_path = argv[i + 1]
+            i += 1
+        elif argv[i] == "--stats":
+            stats = True
+        else:
+            paths.append(argv[i])
+        i += 1
+    if not paths:
+        print(__doc__)
+        return 1
+    files = _files(paths)
+    decoder = Decoder(*load_dict(dict_path or paths[0] + ".dict"))
+    out = sys.stdout
+    for path in files:
+        with open(path, "rb") as f:
+            for line in decoder.decode(f.read()):
+                out.write(line + "\n")
+    if stats and decoder.records:
+        sys.stderr.write("%d records, %d bytes, %.1f bytes/record\n" % (
+            decoder.records, decoder.size, decoder.size / decoder.records))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
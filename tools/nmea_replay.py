@@ -0,0 +1,127 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :nmea_replay.py
+@brief     :Replay an NMEA recording through location.GNSSBase on a host.
+
+The recording is written by location.NMEARecorder, a plain NMEA log (one read per line) is also accepted.
+Each record is passed to `GNSSBase._parse_loc` as one read, at maximum speed or at the recorded pace.
+The report covers sentences per second, parse latency percentiles of one read and bytes allocated per fix,
+allocations are measured in a second pass with tracemalloc so they do not slow down the timed pass.
+
+Usage:
+    python3 tools/nmea_replay.py <file> [--realtime] [--speed 10] [--no-alloc]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import host_env
+
+host_env.install()
+from modules.location import GNSSBase  # noqa: E402
+
+
+def load(path):
+    """Load records [(ticks_ms, data), ...]."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    records = []
+    pos = 0
+    while pos < len(raw):
+        eol = raw.find(b"\n", pos)
+        if eol < 0:
+            break
+        header = raw[pos:eol].split()
+        if len(header) != 2 or not header[0].isdigit() or not header[1].isdigit():
+            # Plain NMEA log, one line per read, 1 s per RMC.
+            records = []
+            ticks = 0
+            for line in raw.splitlines(True):
+                records.append((ticks, line))
+                if line[3:6] == b"RMC":
+                    ticks += 1000
+            return records
+        start = eol + 1
+        size = int(header[1])
+        records.append((int(header[0]), raw[start:start + size]))
+        pos = start + size
+    return records
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def replay(records, speed=0, alloc=False):
+    gnss = GNSSBase()
+    fixes = [0]
+    gnss.subscribe(lambda fix: fixes.__setitem__(0, fixes[0] + 1))
+    latencies = []
+    allocated = 0
+    first_tick = records[0][0]
+    wall_start = time.perf_counter()
+    for tick, data in records:
+        if speed:
+            delay = (tick - first_tick) / 1000.0 / speed - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+        if alloc:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        gnss._parse_loc(data)
+        latencies.append(time.perf_counter() - start)
+        if alloc:
+            allocated += tracemalloc.get_traced_memory()[1] - before
+    return gnss, fixes[0], latencies, allocated
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return
+    path = argv[0]
+    speed = 0
+    alloc = "--no-alloc" not in argv
+    if "--realtime" in argv:
+        speed = 1
+    if "--speed" in argv:
+        speed = float(argv[argv.index("--speed") + 1])
+
+    records = load(path)
+    if not records:
+        print("no records in %s" % path)
+        return
+    size = sum(len(data) for _, data in records)
+    gnss, fixes, latencies, _ = replay(records, speed)
+    stats = gnss.nmea_stats()
+    parse_time = sum(latencies)
+    latencies.sort()
+    print("records: %d, bytes: %d, fixes: %d, nmea: %s" % (len(records), size, fixes, stats))
+    print("parse time: %.1f ms, %.0f sentences/s, %.0f KB/s" % (
+        parse_time * 1000, stats["good"] / parse_time, size / 1024 / parse_time))
+    print("latency per read (us): p50 %.1f, p90 %.1f, p99 %.1f, max %.1f" % tuple(
+        percentile(latencies, pct) * 1000000 for pct in (50, 90, 99, 100)))
+    if alloc:
+        tracemalloc.start()
+        _, fixes, _, allocated = replay(records, alloc=True)
+        tracemalloc.stop()
+        print("allocated: %.0f bytes/fix (peak per read, tracemalloc)" % (allocated / max(fixes, 1)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,164 @@
+# Copyright (c) Quectel Wireless Solution, Co., Ltd.All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+@file      :trajectory.py
+@brief     :Online track simplification.
+@version   :1.0.0
+@date      :2026-10-18 10:00:00
+@copyright :Copyright (c) 2022
+"""
+
+import math
+
+__all__ = ["TrackCompressor"]
+
+_M_PER_DEG = 6371008.8 * math.pi / 180.0
+
+
+class TrackCompressor:
+    """This class is online track simplification with a bounded error.
+
+    Fixes are pushed one by one and only the points needed to keep every dropped fix within
+    `tolerance` metres of the polyline of kept points are emitted. It uses the sleeve (cone intersection)
+    algorithm: every fix after the last kept point (anchor) narrows the range of directions a segment
+    from the anchor may take, when a fix falls outside this range or moves back towards the anchor the
+    previous fix is kept as the new anchor. The state is the anchor, the previous fix and the direction range, O(1) per track.
+
+    Fixes can be any object with `time`, `lat` and `lng` attributes, e.g. `location.GNSSFix`.
+
+    Usage:
+        from usr.modules.history import History
+        from usr.modules.trajectory import TrackCompressor
+
+        history = History()
+        compressor = TrackCompressor(tolerance=10, max_interval=300)
+
+        def on_fix(fix):
+            point = compressor.push(fix)
+            if point is not None:
+                history.write([point])
+
+        gnss.subscribe(on_fix)
+    """
+
+    def __init__(self, tolerance=10, max_interval=0):
+        """
+        Args:
+            tolerance (float): max distance of a dropped fix from the kept polyline (m). (default: 10)
+            max_interval (int): max time between kept points (s), 0 - no limit. (default: 0)
+        """
+        assert tolerance > 0, "tolerance must be larger than 0."
+        self.__tolerance = tolerance
+        self.__max_interval = max_interval
+        self.__anchor = None
+        self.__prev = None
+        self.__cos_lat = 1.0
+        self.__ref = None
+        self.__reach = 0.0
+        self.__lo = 0.0
+        self.__hi = 0.0
+        self.__pushed = 0
+        self.__emitted = 0
+
+    def __set_anchor(self, fix):
+        self.__anchor = fix
+        self.__cos_lat = math.cos(math.radians(fix.lat))
+        self.__ref = None
+        self.__reach = 0.0
+        self.__emitted += 1
+
+    def __narrow(self, fix):
+        """Check fix against the direction range of the anchor and narrow the range by the fix.
+
+        Returns:
+            bool: True - fix is inside the range, False - the anchor must move.
+        """
+        x = (fix.lng - self.__anchor.lng) * _M_PER_DEG * self.__cos_lat
+        y = (fix.lat - self.__anchor.lat) * _M_PER_DEG
+        dist = math.sqrt(x * x + y * y)
+        # Side error 0.8 and overshoot 0.6 of the tolerance keep the error to a segment within tolerance.
+        if dist < self.__reach - 0.6 * self.__tolerance:
+            # Moving back, a segment ending here would cut off the farther fixes.
+            return False
+        if dist > self.__reach:
+            self.__reach = dist
+        side = 0.8 * self.__tolerance
+        if dist <= side:
+            # Any segment from the anchor passes within tolerance of this fix, but it must still
+            # point inside the range to be an end of the segment.
+            if self.__ref is None:
+                return True
+            half = math.pi
+        else:
+            half = math.asin(side / dist)
+        theta = math.atan2(y, x)
+        if self.__ref is None:
+            self.__ref = theta
+            self.__lo = -half
+            self.__hi = half
+            return True
+        rel = (theta - self.__ref + math.pi) % (2 * math.pi) - math.pi
+        if rel < self.__lo or rel > self.__hi:
+            return False
+        self.__lo = max(self.__lo, rel - half)
+        self.__hi = min(self.__hi, rel + half)
+        return True
+
+    def push(self, fix):
+        """Push a fix.
+
+        Args:
+            fix (GNSSFix): gnss fix, fixes must be pushed in time order.
+
+        Returns:
+            GNSSFix: point to keep, None if nothing to keep now. The kept point is the fix itself
+                     or the fix pushed before it.
+        """
+        self.__pushed += 1
+        if self.__anchor is None:
+            self.__set_anchor(fix)
+            self.__prev = fix
+            return fix
+        point = None
+        if not self.__narrow(fix):
+            point = self.__prev
+            self.__set_anchor(point)
+            self.__narrow(fix)
+        elif self.__max_interval and fix.time - self.__anchor.time >= self.__max_interval:
+            point = fix
+            self.__set_anchor(point)
+        self.__prev = fix
+        return point
+
+    def flush(self):
+        """End the track.
+
+        Returns:
+            GNSSFix: last fix if it is not kept yet, None if it is.
+        """
+        point = self.__prev if self.__prev is not None and self.__prev is not self.__anchor else None
+        if point is not None:
+            self.__emitted += 1
+        self.__anchor = None
+        self.__prev = None
+        return point
+
+    def stats(self):
+        """Get counters.
+
+        Returns:
+            dict: {"pushed": int, "emitted": int}
+        """
+        return {"pushed": self.__pushed, "emitted": self.__emitted}